@@ -1,7 +1,10 @@
-from flask import Flask, request, jsonify
+import os
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from services.ebay_scraper import fetch_and_save_reviews
-from services.bestbuy_reviews_to_mongo import scrape_and_store_reviews
+from services.ebay_scraper import fetch_and_save_reviews, extract_product_id, iter_raw_reviews, raw_reviews_page
+from services.bestbuy_reviews_to_mongo import (
+    scrape_and_store_reviews, extract_sku, iter_cached_reviews, cached_reviews_page,
+)
 from services.nlp_utils import (
     process_reviews,
     generate_ai_summary_api,
@@ -10,19 +13,150 @@ from services.nlp_utils import (
 )
 from bson import ObjectId
 from services import nlp_utils as nlp
+from services import repository
+from services.http_client import get_http_client
+from services.jobs import JobQueue
+from services.singleflight import SingleFlight
+from services import product_stats
+from services.mongo_iter import ndjson
+from services.json_codec import FastJSONProvider, compress_response
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # ObjectId / datetime encoded natively, no per-doc copy
 CORS(app)
 
-# ✅ Helper — clean MongoDB documents for JSON output
-def clean_mongo_docs(docs):
-    cleaned = []
-    for d in docs:
-        d = dict(d)  # ensure it's a regular dict
-        if "_id" in d:
-            d["_id"] = str(d["_id"])  # convert ObjectId → string
-        cleaned.append(d)
-    return cleaned
+
+@app.after_request
+def _compress(response):
+    return compress_response(response, request.accept_encodings)
+
+
+# ✅ Single-flight: concurrent requests for the same product share one computation
+flights = SingleFlight(
+    get_lease_collection=repository.locks
+    if os.getenv("SINGLEFLIGHT_MONGO", "").lower() in ("1", "true", "yes") else None,
+    lease_ttl=float(os.getenv("SINGLEFLIGHT_LEASE_TTL", "600")),
+)
+
+
+# ✅ Payload builders — shared by the sync routes and background jobs
+def scrape_bestbuy_payload(url):
+    reviews = scrape_and_store_reviews(url)
+    return {"count": len(reviews), "reviews": reviews}
+
+
+def scrape_ebay_payload(url):
+    reviews = fetch_and_save_reviews(url)
+    return {"count": len(reviews), "reviews": reviews}
+
+
+def process_payload(product_id):
+    return flights.do(("process", product_id), lambda: _build_process_payload(product_id))
+
+
+def _build_process_payload(product_id):
+    # NLP only runs for unprocessed products; the payload is one indexed read
+    process_reviews(product_id, return_docs=False)
+    return product_stats.to_response(product_id, nlp.get_product_stats(product_id))
+
+
+def summary_payload(product_id, mode=None):
+    mode = nlp.summary_mode(mode)
+    return flights.do(
+        ("summary", product_id, mode),
+        lambda: {"summary": generate_ai_summary_api(product_id, mode=mode), "mode": mode},
+    )
+
+
+# Job results are stored in Mongo, so scrape jobs keep only the count; page
+# the stored reviews with POST /api/scrape_<source>?limit=… (no re-scrape)
+def scrape_bestbuy_job(url):
+    return {"count": scrape_and_store_reviews(url, collect=False), "product_id": extract_sku(url), "url": url}
+
+
+def scrape_ebay_job(url):
+    return {"count": fetch_and_save_reviews(url, collect=False), "product_id": extract_product_id(url), "url": url}
+
+
+# ✅ Background jobs — long scrapes / NLP / summaries off the request thread
+jobs = JobQueue(repository.jobs, workers=int(os.getenv("JOB_WORKERS", "2")))
+jobs.register("scrape_bestbuy", scrape_bestbuy_job)
+jobs.register("scrape_ebay", scrape_ebay_job)
+jobs.register("process", process_payload)
+jobs.register("summary", summary_payload)
+
+
+def _flag(name):
+    return request.args.get(name, "").lower() in ("1", "true", "yes")
+
+
+def _wants_async():
+    return _flag("async")
+
+
+def _submit(kind, key, **kwargs):
+    repository.ensure_indexes()  # the active (kind, key) index is what coalesces jobs
+    job = jobs.submit(kind, key, **kwargs)
+    return jsonify(job), 202
+
+
+# ✅ Streaming (?stream=1): NDJSON, one review per line, read from a cursor
+def _wants_stream():
+    return _flag("stream")
+
+
+def _ndjson_response(count, docs):
+    return Response(
+        stream_with_context(ndjson(docs)),
+        mimetype="application/x-ndjson",
+        headers={"X-Review-Count": str(count)},
+    )
+
+
+# ✅ Paging (?limit=&cursor=&fields=) and counts-only (?counts=1) reads
+REVIEW_FIELDS = ("id", "sku", "product_id", "source", "reviewer", "rating", "title", "text", "date")
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", "1000"))
+
+
+def _wants_page():
+    return _flag("counts") or any(k in request.args for k in ("limit", "cursor", "fields"))
+
+
+def _page_args():
+    """Parse limit / cursor / fields; raises ValueError on bad input."""
+    try:
+        limit = int(request.args.get("limit", DEFAULT_PAGE_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    limit = max(1, min(limit, MAX_PAGE_LIMIT))
+
+    after = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        if not ObjectId.is_valid(cursor):
+            raise ValueError("Invalid cursor")
+        after = ObjectId(cursor)
+
+    projection = None
+    fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
+    if fields:
+        unknown = sorted(set(fields) - set(REVIEW_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(REVIEW_FIELDS)}")
+        projection = {f: 1 for f in fields}
+    return limit, after, projection
+
+
+def _page_response(count, page_fn, key, page_args):
+    if _flag("counts"):
+        return jsonify({"count": count})
+    docs, next_after = page_fn(key, *page_args)
+    return jsonify({
+        "count": count,
+        "reviews": docs,
+        "next_cursor": str(next_after) if next_after else None,
+    })
 
 
 # ✅ Route 1: Scrape BestBuy reviews
@@ -33,9 +167,16 @@ def scrape_bestbuy():
     if not url:
         return jsonify({"error": "Missing URL"}), 400
     try:
-        reviews = scrape_and_store_reviews(url)
-        reviews = clean_mongo_docs(reviews)
-        return jsonify({"count": len(reviews), "reviews": reviews})
+        if _wants_async():
+            return _submit("scrape_bestbuy", extract_sku(url), url=url)
+        if _wants_page():
+            page_args = _page_args()
+            count = scrape_and_store_reviews(url, collect=False)
+            return _page_response(count, cached_reviews_page, extract_sku(url), page_args)
+        if _wants_stream():
+            count = scrape_and_store_reviews(url, collect=False)
+            return _ndjson_response(count, iter_cached_reviews(extract_sku(url)))
+        return jsonify(scrape_bestbuy_payload(url))
     except ValueError as ve:
         # SKU extraction / missing API key etc.
         return jsonify({"error": str(ve)}), 400
@@ -52,9 +193,18 @@ def scrape_ebay():
     if not url:
         return jsonify({"error": "Missing URL"}), 400
     try:
-        reviews = fetch_and_save_reviews(url)
-        reviews = clean_mongo_docs(reviews)
-        return jsonify({"count": len(reviews), "reviews": reviews})
+        if _wants_async():
+            return _submit("scrape_ebay", extract_product_id(url), url=url)
+        if _wants_page():
+            page_args = _page_args()
+            count = fetch_and_save_reviews(url, collect=False)
+            return _page_response(count, raw_reviews_page, extract_product_id(url), page_args)
+        if _wants_stream():
+            count = fetch_and_save_reviews(url, collect=False)
+            return _ndjson_response(count, iter_raw_reviews(extract_product_id(url)))
+        return jsonify(scrape_ebay_payload(url))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         print("⚠️ eBay route error:", e)
         return jsonify({"error": str(e)}), 500
@@ -64,58 +214,9 @@ def scrape_ebay():
 @app.route('/api/process/<product_id>', methods=['GET'])
 def process_product(product_id):
     try:
-        from collections import Counter, defaultdict
-        docs = process_reviews(product_id)
-
-        # ---- Sentiment and Aspect Summary ----
-        sentiments = Counter([d.get("sentiment") for d in docs if "sentiment" in d])
-        aspect_map = defaultdict(lambda: {"Positive": 0, "Negative": 0, "Neutral": 0})
-
-        for d in docs:
-            for aspect in d.get("aspects", []):
-                s = d.get("sentiment", "Neutral")
-                aspect_map[aspect][s] += 1
-
-        # ---- Aspect-based sample reviews (top by confidence) ----
-        aspect_examples = defaultdict(lambda: {"Positive": [], "Neutral": [], "Negative": []})
-        for d in docs:
-            text = (d.get("text") or "").strip()
-            if not text:
-                continue
-            conf = float(d.get("confidence") or 0.0)
-            s = d.get("sentiment", "Neutral")
-            for aspect in d.get("aspects", []) or []:
-                aspect_examples[aspect][s].append({"text": text, "confidence": conf})
-
-        # keep only top 3 per sentiment per aspect
-        for a, buckets in aspect_examples.items():
-            for s in ("Positive", "Neutral", "Negative"):
-                buckets[s] = sorted(buckets[s], key=lambda x: x["confidence"], reverse=True)[:3]
-
-        # ---- Top 5 Positive and Negative Reviews ----
-        positive_comments = [
-            {"text": d.get("text"), "confidence": d.get("confidence", 0)}
-            for d in docs if d.get("sentiment") == "Positive"
-        ]
-        negative_comments = [
-            {"text": d.get("text"), "confidence": d.get("confidence", 0)}
-            for d in docs if d.get("sentiment") == "Negative"
-        ]
-
-        # Sort by confidence (strongest sentiments first)
-        positive_comments = sorted(positive_comments, key=lambda x: x["confidence"], reverse=True)[:5]
-        negative_comments = sorted(negative_comments, key=lambda x: x["confidence"], reverse=True)[:5]
-
-        # ---- Final JSON ----
-        return jsonify({
-            "product_id": product_id,
-            "total_reviews": len(docs),
-            "sentiments": dict(sentiments),
-            "aspects": {k: dict(v) for k, v in aspect_map.items()},
-            "aspect_examples": {k: v for k, v in aspect_examples.items()},
-            "top_positive": positive_comments,
-            "top_negative": negative_comments
-        })
+        if _wants_async():
+            return _submit("process", product_id, product_id=product_id)
+        return jsonify(process_payload(product_id))
 
     except Exception as e:
         print("⚠️ Error in process_product:", e)
@@ -127,12 +228,58 @@ def process_product(product_id):
 @app.route('/api/summary/<product_id>', methods=['GET'])
 def summary(product_id):
     try:
-        summary_text = generate_ai_summary_api(product_id)
-        return jsonify({"summary": summary_text})
+        # ?mode=extractive: ranked review sentences in milliseconds, no model
+        mode = nlp.summary_mode(request.args.get("mode"))
+        if _wants_async():
+            key = product_id if mode == "abstractive" else f"{product_id}:{mode}"
+            return _submit("summary", key, product_id=product_id, mode=mode)
+        return jsonify(summary_payload(product_id, mode))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# ✅ Job routes: submit / status / result
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    data = request.get_json() or {}
+    kind = data.get("kind")
+    try:
+        if kind in ("scrape_bestbuy", "scrape_ebay"):
+            url = data.get("url")
+            if not url:
+                return jsonify({"error": "Missing URL"}), 400
+            key = extract_sku(url) if kind == "scrape_bestbuy" else extract_product_id(url)
+            return _submit(kind, key, url=url)
+        product_id = data.get("product_id")
+        if not product_id:
+            return jsonify({"error": "Missing product_id"}), 400
+        return _submit(kind, product_id, product_id=product_id)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = jobs.get(job_id, with_result=True)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    if job["status"] == "failed":
+        return jsonify({"error": job["error"], "job_id": job_id}), 500
+    if job["status"] != "done":
+        return jsonify({k: v for k, v in job.items() if k != "result"}), 202
+    return jsonify(job["result"])
+
+
 # ✅ Route 5: Compare two products
 @app.route('/api/compare', methods=['POST'])
 def compare_api():
@@ -211,6 +358,7 @@ def compare_api():
 
 
 if __name__ == "__main__":
+    repository.ensure_indexes()
     print("🚀 Flask backend ready — using local AI summarizer for summaries and comparisons.")
     app.run(debug=False)
 
@@ -222,7 +370,11 @@ def health():
         sum_available = bool(getattr(nlp, 'summarizer', None)) or bool(nlp.get_summarizer())
         return jsonify({
             "status": "ok",
-            "summarizer_loaded": sum_available
+            "summarizer_loaded": sum_available,
+            "summarizer_backend": nlp.SUMMARIZER_BACKEND,
+            "http": get_http_client().stats(),
+            "summary_cache": nlp.summary_cache.stats(),
+            "singleflight": dict(flights.stats),
         })
     except Exception as e:
         return jsonify({"status": "error", "detail": str(e) }), 500
@@ -0,0 +1,76 @@
+"""Throughput of analyze_batch vs the per-review analyze_sentiment / analyze_aspects.
+
+Builds N unique reviews by sampling sentences from the bundled eBay reviews
+(so the per-text memo can't help), analyzes them both ways and checks that
+labels, confidences and aspects are identical.
+
+    python benchmarks/bench_analyze_batch.py [--reviews 5000,20000] [--repeat 3]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services import extractive  # noqa: E402
+from services import nlp_utils as nlp  # noqa: E402
+
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+
+
+def synthetic_reviews(n, seed=0):
+    sentences = []
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "ebay_reviews_*.json"))):
+        with open(path, encoding="utf-8") as f:
+            for r in json.load(f):
+                sentences.extend(extractive.split_sentences(r.get("text") or ""))
+    rng = random.Random(seed)
+    return [f"{' '.join(rng.sample(sentences, rng.randint(1, 4)))} #{i}" for i in range(n)]
+
+
+def per_review(texts):
+    return [(*nlp.analyze_sentiment(t), nlp.analyze_aspects(t)) for t in texts]
+
+
+def batched(texts):
+    matcher = nlp.get_aspect_matcher()
+    batch = nlp.analyze_batch(texts, matcher)
+    return [
+        (s, c, matcher.names(m))
+        for s, c, m in zip(batch["sentiment"], batch["confidence"], batch["aspect_mask"])
+    ]
+
+
+def timed(fn, texts, repeat):
+    times = []
+    for _ in range(repeat):
+        nlp._vader_scorer = None  # cold token cache each run
+        t0 = time.perf_counter()
+        out = fn(texts)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reviews", default="5000,20000")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    nlp.preload_models(with_summarizer=False)
+    print(f"{'reviews':>8s} {'per-review ms':>14s} {'batch ms':>9s} {'speedup':>8s} {'identical':>10s}")
+    for n in (int(x) for x in args.reviews.split(",")):
+        texts = synthetic_reviews(n)
+        single_ms, expected = timed(per_review, texts, args.repeat)
+        batch_ms, got = timed(batched, texts, args.repeat)
+        print(f"{n:8d} {single_ms:14.0f} {batch_ms:9.0f} {single_ms / batch_ms:7.1f}x {str(got == expected):>10s}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Latency of the extractive summary mode (services.extractive).
+
+Builds N reviews by sampling sentences from the bundled eBay reviews (so
+the vocabulary is real but the set is larger than the sample), then times
+extractive_summary end to end, plus the sentence split + TF-IDF and
+LexRank power iteration stages on their own.
+
+    python benchmarks/bench_extractive.py [--reviews 2000,5000,10000] [--repeat 5]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services import extractive  # noqa: E402
+from services.aspect_matcher import AspectMatcher  # noqa: E402
+from services.nlp_utils import ASPECT_KEYWORDS  # noqa: E402
+
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+
+
+def sample_sentences():
+    sentences = []
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "ebay_reviews_*.json"))):
+        with open(path, encoding="utf-8") as f:
+            for r in json.load(f):
+                sentences.extend(extractive.split_sentences(r.get("text") or ""))
+    return sentences
+
+
+def synthetic_reviews(sentences, n, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(sentences, rng.randint(1, 4))) for _ in range(n)]
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reviews", default="2000,5000,10000")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    pool = sample_sentences()
+    matcher = AspectMatcher(ASPECT_KEYWORDS)
+    print(f"{'reviews':>8s} {'sentences':>10s} {'split+tfidf ms':>15s} {'lexrank ms':>11s} {'total ms':>9s}")
+    summary = ""
+    for n in (int(x) for x in args.reviews.split(",")):
+        texts = synthetic_reviews(pool, n)
+        sentences = extractive._candidate_sentences(texts)
+        tfidf_ms, (indptr, indices, data, keep) = timed(
+            lambda: extractive.tfidf_matrix(extractive._candidate_sentences(texts)), args.repeat
+        )
+        lexrank_ms, _ = timed(lambda: extractive.lexrank(indptr, indices, data, keep), args.repeat)
+        total_ms, summary = timed(lambda: extractive.extractive_summary(texts, matcher), args.repeat)
+        print(f"{n:8d} {len(sentences):10d} {tfidf_ms:15.1f} {lexrank_ms:11.1f} {total_ms:9.1f}")
+    print(f"\nSample summary:\n{summary}")
+
+
+if __name__ == "__main__":
+    main()
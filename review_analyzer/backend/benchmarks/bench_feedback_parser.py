@@ -0,0 +1,84 @@
+"""Micro-benchmark: eBay feedback card extraction backends.
+
+Runs every backend in services.feedback_parser over the saved
+data/debug_*.html pages, checks each returns the same reviews as the
+original full html.parser path, and prints ms per page.
+
+Empty debug dumps are skipped; if none have content, a synthetic item page
+(~1 MB of filler markup plus feedback cards built from data/ebay_reviews_*.json)
+is used instead.
+
+    python benchmarks/bench_feedback_parser.py [--repeat 20]
+"""
+import argparse
+import glob
+import html
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.feedback_parser import CARD_EXTRACTORS  # noqa: E402
+
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+
+
+def synthetic_page():
+    reviews = []
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "ebay_reviews_*.json"))):
+        with open(path, encoding="utf-8") as f:
+            reviews.extend(json.load(f))
+    cards = "".join(
+        '<li class="fdbk-container"><div class="fdbk-container__details">'
+        f'<div class="fdbk-container__details__info__username"><span>{html.escape(r.get("reviewer", ""))}</span></div>'
+        f'<div class="fdbk-container__details__comment"><span>{html.escape(r["text"])}</span></div>'
+        f'<div class="fdbk-container__details__info__divide__time"><span>{html.escape(r.get("date", ""))}</span></div>'
+        "</div></li>"
+        for r in reviews
+    )
+    filler = "".join(
+        f'<div class="x-item-section s{i}"><a href="/itm/{i}">Related item {i}</a><span>lorem ipsum</span></div>'
+        for i in range(5000)
+    )
+    return ("<html><head><title>Item | eBay</title></head><body>"
+            f'<a href="https://www.ebay.com/usr/seller">seller</a>{filler}<ul>{cards}</ul>{filler}</body></html>')
+
+
+def load_pages():
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "debug_*.html"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        if text.strip():
+            pages[os.path.basename(path)] = text
+    if not pages:
+        print("ℹ️ data/debug_*.html fixtures are empty — using a synthetic item page.")
+        pages["synthetic"] = synthetic_page()
+    return pages
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    pages = load_pages()
+    for name, page in pages.items():
+        expected = CARD_EXTRACTORS["full"](page, "bench", "bench")
+        print(f"\n📄 {name}: {len(page) / 1024:.0f} KB, {len(expected)} cards")
+        baseline = None
+        for backend, fn in CARD_EXTRACTORS.items():
+            assert fn(page, "bench", "bench") == expected, f"{backend} output differs from full parser"
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                fn(page, "bench", "bench")
+            ms = (time.perf_counter() - start) * 1000 / args.repeat
+            baseline = baseline or ms
+            print(f"  {backend:<10} {ms:8.2f} ms/page  ({baseline / ms:.1f}x vs full)")
+
+
+if __name__ == "__main__":
+    main()
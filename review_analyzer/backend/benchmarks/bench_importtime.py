@@ -0,0 +1,75 @@
+"""Startup benchmark: cold-import cost of the backend.
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters,
+reports wall time and the heaviest imports by cumulative time, and flags
+heavy dependencies (transformers, torch, nltk, ...) that should only load
+on first use.
+
+    python benchmarks/bench_importtime.py [--module app] [--repeat 5] [--top 15]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported lazily by the services; seeing one here is a startup regression
+HEAVY = ("transformers", "torch", "nltk", "onnxruntime", "optimum", "numpy")
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_once(module):
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR, "PYTHONDONTWRITEBYTECODE": "1"}
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        sys.exit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            self_us, cumulative_us, indent, name = m.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return wall, rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--module", default="app")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15)
+    args = ap.parse_args()
+
+    walls = []
+    rows = []
+    for _ in range(args.repeat):
+        wall, rows = run_once(args.module)
+        walls.append(wall)
+
+    top_level = [r for r in rows if r[3] == 0]
+    total_us = sum(r[2] for r in top_level)
+    print(f"import {args.module}: wall median {statistics.median(walls) * 1000:.0f} ms "
+          f"(min {min(walls) * 1000:.0f} ms over {args.repeat} runs), importtime total {total_us / 1000:.0f} ms")
+
+    print(f"\nTop {args.top} imports by cumulative time (last run):")
+    for name, self_us, cum_us, depth in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"  {cum_us / 1000:8.1f} ms  self {self_us / 1000:7.1f} ms  {'  ' * depth}{name}")
+
+    loaded = sorted({r[0].split(".")[0] for r in rows} & set(HEAVY))
+    if loaded:
+        print(f"\n⚠️ Heavy modules imported at startup: {', '.join(loaded)}")
+    else:
+        print(f"\n✅ None of {', '.join(HEAVY)} imported at startup")
+
+
+if __name__ == "__main__":
+    main()
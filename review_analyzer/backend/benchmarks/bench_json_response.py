@@ -0,0 +1,110 @@
+"""Micro-benchmark: serializing a 10k-review scrape response.
+
+Compares the old path (clean_mongo_docs copy + Flask's default json
+provider) against services.json_codec (orjson provider, ObjectId/datetime
+handled in the encoder), and reports gzip/brotli size and time for the
+encoded body.
+
+    python benchmarks/bench_json_response.py [--reviews 10000] [--repeat 10]
+"""
+import argparse
+import gzip
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bson import ObjectId  # noqa: E402
+from flask import Flask, jsonify  # noqa: E402
+from services import json_codec  # noqa: E402
+from services.json_codec import FastJSONProvider  # noqa: E402
+
+WORDS = ("battery", "screen", "fast", "shipping", "great", "price", "broke", "after", "a", "week",
+         "quality", "seller", "recommend", "sound", "camera", "value")
+
+
+def synthetic_reviews(n):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "id": 100000 + i,
+            "sku": "6500000",
+            "product_id": "6500000",
+            "source": "bestbuy",
+            "reviewer": f"user{i}",
+            "rating": i % 5 + 1,
+            "title": "Review title",
+            "text": " ".join(WORDS[(i * 7 + j) % len(WORDS)] for j in range(40)),
+            "date": (start + timedelta(minutes=i)).isoformat(),
+            "scraped_at": start + timedelta(seconds=i),
+        }
+        for i in range(n)
+    ]
+
+
+def clean_mongo_docs(docs):
+    # The per-doc copy the routes used before json_codec
+    cleaned = []
+    for d in docs:
+        d = dict(d)
+        if "_id" in d:
+            d["_id"] = str(d["_id"])
+        cleaned.append(d)
+    return cleaned
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reviews", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    docs = synthetic_reviews(args.reviews)
+    old_app = Flask("old")
+    new_app = Flask("new")
+    new_app.json = FastJSONProvider(new_app)
+
+    def old():
+        with old_app.app_context():
+            reviews = clean_mongo_docs(docs)
+            return jsonify({"count": len(reviews), "reviews": reviews}).get_data()
+
+    def new():
+        with new_app.app_context():
+            return jsonify({"count": len(docs), "reviews": docs}).get_data()
+
+    old_ms, old_body = timed(old, args.repeat)
+    new_ms, new_body = timed(new, args.repeat)
+    # Flask's default provider writes datetimes as HTTP dates, json_codec as ISO 8601
+    strip = lambda body: [{k: v for k, v in r.items() if k != "scraped_at"} for r in json_codec.loads(body)["reviews"]]
+    assert strip(old_body) == strip(new_body), "encoders disagree"
+
+    print(f"{args.reviews} reviews, best of {args.repeat} (encoder: {'orjson' if json_codec.orjson else 'json'})")
+    print(f"  {'clean_mongo_docs + jsonify':28s} {old_ms:8.1f} ms  {len(old_body) / 1e6:6.2f} MB")
+    print(f"  {'json_codec provider':28s} {new_ms:8.1f} ms  {len(new_body) / 1e6:6.2f} MB  ({old_ms / new_ms:.1f}x)")
+
+    gz_ms, gz = timed(lambda: gzip.compress(new_body, compresslevel=json_codec.GZIP_LEVEL), args.repeat)
+    print(f"  {'+ gzip level ' + str(json_codec.GZIP_LEVEL):28s} {gz_ms:8.1f} ms  {len(gz) / 1e6:6.2f} MB")
+    if json_codec.brotli is not None:
+        br_ms, br = timed(lambda: json_codec.brotli.compress(new_body, quality=json_codec.BROTLI_QUALITY), args.repeat)
+        print(f"  {'+ brotli quality ' + str(json_codec.BROTLI_QUALITY):28s} {br_ms:8.1f} ms  {len(br) / 1e6:6.2f} MB")
+    else:
+        print("  (brotli not installed — skipping br)")
+
+
+if __name__ == "__main__":
+    main()
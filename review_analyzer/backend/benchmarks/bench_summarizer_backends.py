@@ -0,0 +1,115 @@
+"""Quality / latency benchmark for the summarizer backends.
+
+Summarizes a fixed review set (all data/ebay_reviews_*.json texts, in file
+order) with every backend in services.summarizer_backends, using the same
+chunking and generation params as generate_ai_summary_api. Reports load
+time, median summary latency and ROUGE-1 / ROUGE-L F1 against the float32
+torch output (the reference), and prints each summary for eyeballing.
+
+    python benchmarks/bench_summarizer_backends.py [--backends torch,torch-int8,onnx] [--repeat 3]
+
+Backends whose dependencies are missing (e.g. optimum for onnx) are skipped.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services import nlp_utils as nlp  # noqa: E402
+from services.summarizer_backends import BACKENDS, load_summarizer  # noqa: E402
+
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+
+
+def load_texts():
+    texts = []
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "ebay_reviews_*.json"))):
+        with open(path, encoding="utf-8") as f:
+            texts.extend(r["text"] for r in json.load(f) if r.get("text"))
+    return texts
+
+
+def _tokens(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def _f1(overlap, n_pred, n_ref):
+    if not overlap:
+        return 0.0
+    p, r = overlap / n_pred, overlap / n_ref
+    return 2 * p * r / (p + r)
+
+
+def rouge1(pred, ref):
+    from collections import Counter
+    p, r = Counter(_tokens(pred)), Counter(_tokens(ref))
+    return _f1(sum((p & r).values()), sum(p.values()), sum(r.values()))
+
+
+def rouge_l(pred, ref):
+    a, b = _tokens(pred), _tokens(ref)
+    if not a or not b:
+        return 0.0
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        cur = [0]
+        for j, y in enumerate(b):
+            cur.append(prev[j] + 1 if x == y else max(prev[j + 1], cur[j]))
+        prev = cur
+    return _f1(prev[-1], len(a), len(b))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backends", default=",".join(BACKENDS))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--batch-size", type=int, default=int(os.getenv("SUMMARY_BATCH_SIZE", "4")))
+    args = ap.parse_args()
+
+    texts = load_texts()
+    params = nlp._summary_params(len(texts))
+    chunks = nlp.chunk_sentences(texts, params["chunk_size"], params["max_chars"])
+    print(f"{len(texts)} reviews → {len(chunks)} chunks ({sum(len(c) for c in chunks)} chars)\n")
+
+    results = {}
+    for backend in args.backends.split(","):
+        if backend.startswith("torch"):
+            nlp._configure_torch_threads()
+        t0 = time.perf_counter()
+        try:
+            model = load_summarizer(backend, nlp.SUMMARIZER_MODEL)
+        except ImportError as e:
+            print(f"⏭️ {backend}: skipped ({e})")
+            continue
+        load_s = time.perf_counter() - t0
+
+        latencies = []
+        summary = ""
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            summary = nlp.hierarchical_summary(model, chunks, params, args.batch_size)
+            latencies.append(time.perf_counter() - t0)
+        results[backend] = {"load_s": load_s, "latency_s": statistics.median(latencies), "summary": summary}
+        del model
+
+    if not results:
+        sys.exit("No backend could be loaded.")
+    reference = results.get("torch", next(iter(results.values())))
+    base = reference["latency_s"]
+    print(f"\n{'backend':12s} {'load s':>8s} {'median s':>9s} {'speedup':>8s} {'ROUGE-1':>8s} {'ROUGE-L':>8s}")
+    for backend, r in results.items():
+        print(f"{backend:12s} {r['load_s']:8.1f} {r['latency_s']:9.2f} {base / r['latency_s']:7.1f}x "
+              f"{rouge1(r['summary'], reference['summary']):8.3f} {rouge_l(r['summary'], reference['summary']):8.3f}")
+    for backend, r in results.items():
+        print(f"\n--- {backend} ---\n{r['summary']}")
+
+
+if __name__ == "__main__":
+    main()
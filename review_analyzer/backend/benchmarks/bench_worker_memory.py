@@ -0,0 +1,67 @@
+"""Per-worker memory of a running gunicorn: RSS vs PSS vs USS.
+
+RSS counts shared copy-on-write pages in every worker, so compare PSS
+(shared pages split between sharers) and USS (pages only this process
+owns). With SUMMARIZER_PRELOAD=1 the model weights show up as shared, and
+USS per worker stays small as workers are added. Linux only (reads
+/proc/<pid>/smaps_rollup).
+
+    python benchmarks/bench_worker_memory.py --pid <gunicorn master pid>
+"""
+import argparse
+import os
+
+
+def children(pid):
+    out = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # pid (comm) state ppid ... — comm may contain spaces
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            out.append(int(entry))
+    return sorted(out)
+
+
+def memory(pid):
+    """{Rss, Pss, Uss} in kB for one process."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":"):
+                try:
+                    fields[parts[0][:-1]] = int(parts[1])
+                except ValueError:
+                    pass
+    return {
+        "Rss": fields.get("Rss", 0),
+        "Pss": fields.get("Pss", 0),
+        "Uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pid", type=int, required=True, help="gunicorn master pid")
+    args = ap.parse_args()
+
+    rows = [("master", args.pid)] + [("worker", p) for p in children(args.pid)]
+    totals = {"Rss": 0, "Pss": 0, "Uss": 0}
+    print(f"{'process':8s} {'pid':>8s} {'RSS MB':>9s} {'PSS MB':>9s} {'USS MB':>9s}")
+    for name, pid in rows:
+        m = memory(pid)
+        for k in totals:
+            totals[k] += m[k]
+        print(f"{name:8s} {pid:8d} {m['Rss'] / 1024:9.1f} {m['Pss'] / 1024:9.1f} {m['Uss'] / 1024:9.1f}")
+    print(f"{'total':8s} {'':8s} {totals['Rss'] / 1024:9.1f} {totals['Pss'] / 1024:9.1f} {totals['Uss'] / 1024:9.1f}")
+    print("\nPSS total is the real footprint; RSS total double-counts shared pages.")
+
+
+if __name__ == "__main__":
+    main()
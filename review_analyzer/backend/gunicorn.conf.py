@@ -0,0 +1,56 @@
+"""gunicorn settings for the backend.
+
+    gunicorn -c gunicorn.conf.py app:app
+    SUMMARIZER_PRELOAD=1 GUNICORN_WORKERS=8 gunicorn -c gunicorn.conf.py app:app
+
+With SUMMARIZER_PRELOAD=1 the app is imported and DistilBART loaded once in
+the master before fork; workers share those pages copy-on-write, so RSS
+stays roughly flat as workers are added and no worker stalls on its first
+summary. benchmarks/bench_worker_memory.py reports per-worker PSS/USS.
+"""
+import gc
+import os
+
+_truthy = ("1", "true", "yes")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+# Sync scrapes and summaries can take minutes; async jobs avoid this (?async=1)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+
+SUMMARIZER_PRELOAD = os.getenv("SUMMARIZER_PRELOAD", "").lower() in _truthy
+preload_app = SUMMARIZER_PRELOAD or os.getenv("GUNICORN_PRELOAD", "").lower() in _truthy
+
+# HF tokenizers disable themselves noisily when forked after use
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def when_ready(server):
+    """Master, after the app is loaded and before any worker is forked."""
+    if not preload_app:
+        return
+    from services import db, nlp_utils, repository
+
+    try:
+        repository.ensure_indexes()
+    except Exception as e:
+        server.log.warning("Index setup skipped in master: %s", e)
+    finally:
+        # Workers open their own pools; don't carry a client across fork
+        db.close_client()
+
+    loaded = nlp_utils.preload_models(with_summarizer=SUMMARIZER_PRELOAD)
+    if SUMMARIZER_PRELOAD:
+        server.log.info("Summarizer preloaded in master: %s", "yes" if loaded else "no (see log)")
+    # Move everything loaded so far out of the GC's reach so collections in
+    # the workers don't write to (and un-share) these pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if SUMMARIZER_PRELOAD:
+        from services import nlp_utils
+
+        # Per-worker intra-op threads; the master never ran inference
+        nlp_utils._configure_torch_threads()
@@ -0,0 +1,286 @@
+import os
+from collections import defaultdict
+from pymongo import errors
+
+# =====================================================
+# 🧮 Review Aggregations (Mongo pipelines + Python fallback)
+# =====================================================
+# auto   → run pipelines server-side, fall back to Python if the server
+#          (or mongomock) lacks an operator such as $topN
+# mongo  → pipelines only
+# python → stream projected docs and aggregate client-side
+AGG_BACKEND = os.getenv("AGG_BACKEND", "auto")
+
+SENTIMENTS = ("Positive", "Negative", "Neutral")
+ASPECT_EXAMPLES_K = 3
+TOP_K = 5
+
+_unsupported = set()  # pipelines the server rejected (auto mode)
+
+
+def _run(name, mongo_fn, python_fn, *args):
+    if AGG_BACKEND == "python" or (AGG_BACKEND == "auto" and name in _unsupported):
+        return python_fn(*args)
+    try:
+        return mongo_fn(*args)
+    except (errors.OperationFailure, NotImplementedError) as e:
+        if AGG_BACKEND == "mongo":
+            raise
+        print(f"⚠️ Aggregation '{name}' unsupported by server ({e}); using Python fallback.")
+        _unsupported.add(name)
+        return python_fn(*args)
+
+
+def _by_confidence(items):
+    # Same order as the pipelines' sortBy {confidence: -1, _id: 1}
+    return sorted(items, key=lambda x: (-x[0], x[1]))
+
+
+# ---------- Sentiment counts ----------
+def _sentiment_counts_mongo(col, product_id):
+    rows = col.aggregate([
+        {"$match": {"product_id": product_id}},
+        {"$group": {"_id": "$sentiment", "n": {"$sum": 1}}},
+    ])
+    return {r["_id"]: r["n"] for r in rows}
+
+
+def _sentiment_counts_python(col, product_id):
+    counts = defaultdict(int)
+    for d in col.find({"product_id": product_id}, {"sentiment": 1, "_id": 0}):
+        counts[d.get("sentiment")] += 1
+    return dict(counts)
+
+
+def sentiment_counts(col, product_id):
+    """{sentiment: count} over all processed reviews (None = missing sentiment)."""
+    return _run("sentiment_counts", _sentiment_counts_mongo, _sentiment_counts_python, col, product_id)
+
+
+# ---------- Aspect × sentiment counts ----------
+def _aspect_counts_mongo(col, product_id):
+    rows = col.aggregate([
+        {"$match": {"product_id": product_id, "sentiment": {"$in": list(SENTIMENTS)}}},
+        {"$project": {"_id": 0, "aspects": 1, "sentiment": 1}},
+        {"$unwind": "$aspects"},
+        {"$group": {"_id": {"aspect": "$aspects", "sentiment": "$sentiment"}, "n": {"$sum": 1}}},
+    ])
+    agg = {}
+    for r in rows:
+        a, s = r["_id"]["aspect"], r["_id"]["sentiment"]
+        counts = agg.setdefault(a, {"Positive": 0, "Negative": 0, "Neutral": 0, "Total": 0})
+        counts[s] += r["n"]
+        counts["Total"] += r["n"]
+    return agg
+
+
+def _aspect_counts_python(col, product_id):
+    agg = {}
+    for d in col.find({"product_id": product_id}, {"aspects": 1, "sentiment": 1, "_id": 0}):
+        s = d.get("sentiment")
+        if s not in SENTIMENTS:
+            continue
+        for a in d.get("aspects") or []:
+            counts = agg.setdefault(a, {"Positive": 0, "Negative": 0, "Neutral": 0, "Total": 0})
+            counts[s] += 1
+            counts["Total"] += 1
+    return agg
+
+
+def aspect_sentiment_counts(col, product_id):
+    """{aspect: {Positive, Negative, Neutral, Total}} over reviews with a known sentiment."""
+    return _run("aspect_counts", _aspect_counts_mongo, _aspect_counts_python, col, product_id)
+
+
+# ---------- Top-k examples ----------
+def _top_reviews_mongo(col, product_id, k):
+    rows = col.aggregate([
+        {"$match": {"product_id": product_id, "sentiment": {"$in": ["Positive", "Negative"]}}},
+        {"$group": {
+            "_id": "$sentiment",
+            "top": {"$topN": {
+                "n": k,
+                "sortBy": {"confidence": -1, "_id": 1},
+                # $ifNull keeps a missing text as null instead of dropping the key
+                "output": {
+                    "_id": "$_id",
+                    "text": {"$ifNull": ["$text", None]},
+                    "confidence": {"$ifNull": ["$confidence", 0]},
+                },
+            }},
+        }},
+    ])
+    out = {"Positive": [], "Negative": []}
+    for r in rows:
+        out[r["_id"]] = r["top"]
+    return out
+
+
+def _top_reviews_python(col, product_id, k):
+    buckets = {"Positive": [], "Negative": []}
+    cursor = col.find(
+        {"product_id": product_id, "sentiment": {"$in": ["Positive", "Negative"]}},
+        {"text": 1, "confidence": 1, "sentiment": 1},
+    )
+    for d in cursor:
+        conf = d.get("confidence") or 0  # null confidence sorts as 0, like $ifNull
+        buckets[d["sentiment"]].append((conf, d["_id"], {"_id": d["_id"], "text": d.get("text"), "confidence": conf}))
+    return {s: [x[2] for x in _by_confidence(items)[:k]] for s, items in buckets.items()}
+
+
+def top_reviews(col, product_id, k: int = TOP_K):
+    """Strongest k Positive and Negative reviews by confidence."""
+    return _run("top_reviews", _top_reviews_mongo, _top_reviews_python, col, product_id, k)
+
+
+def _aspect_examples_mongo(col, product_id, k):
+    rows = col.aggregate([
+        {"$match": {"product_id": product_id, "sentiment": {"$in": list(SENTIMENTS)}}},
+        {"$project": {
+            "aspects": 1, "sentiment": 1,
+            "text": {"$trim": {"input": {"$ifNull": ["$text", ""]}}},
+            "confidence": {"$toDouble": {"$ifNull": ["$confidence", 0]}},
+        }},
+        {"$match": {"text": {"$ne": ""}}},
+        {"$unwind": "$aspects"},
+        {"$group": {
+            "_id": {"aspect": "$aspects", "sentiment": "$sentiment"},
+            "top": {"$topN": {
+                "n": k,
+                "sortBy": {"confidence": -1, "_id": 1},
+                "output": {"_id": "$_id", "text": "$text", "confidence": "$confidence"},
+            }},
+        }},
+    ])
+    out = {}
+    for r in rows:
+        a, s = r["_id"]["aspect"], r["_id"]["sentiment"]
+        out.setdefault(a, {"Positive": [], "Neutral": [], "Negative": []})[s] = r["top"]
+    return out
+
+
+def _aspect_examples_python(col, product_id, k):
+    buckets = defaultdict(lambda: {"Positive": [], "Neutral": [], "Negative": []})
+    cursor = col.find(
+        {"product_id": product_id, "sentiment": {"$in": list(SENTIMENTS)}},
+        {"text": 1, "confidence": 1, "sentiment": 1, "aspects": 1},
+    )
+    for d in cursor:
+        text = (d.get("text") or "").strip()
+        if not text:
+            continue
+        conf = float(d.get("confidence") or 0.0)
+        for a in d.get("aspects") or []:
+            buckets[a][d["sentiment"]].append((conf, d["_id"], {"_id": d["_id"], "text": text, "confidence": conf}))
+    return {
+        a: {s: [x[2] for x in _by_confidence(items)[:k]] for s, items in by_s.items()}
+        for a, by_s in buckets.items()
+    }
+
+
+def aspect_examples(col, product_id, k: int = ASPECT_EXAMPLES_K):
+    """Top-k examples per aspect × sentiment by confidence (text trimmed)."""
+    return _run("aspect_examples", _aspect_examples_mongo, _aspect_examples_python, col, product_id, k)
+
+
+# ---------- Combined ----------
+def product_stats_doc(col, product_id):
+    """Full product_stats document computed from the processed collection."""
+    counts = sentiment_counts(col, product_id)
+    sentiments = {s: n for s, n in counts.items() if s}
+    aspects = {
+        a: {s: c[s] for s in SENTIMENTS}
+        for a, c in aspect_sentiment_counts(col, product_id).items()
+    }
+    top = top_reviews(col, product_id)
+    return {
+        "product_id": product_id,
+        "total_reviews": sum(counts.values()),
+        "sentiments": sentiments,
+        "aspects": aspects,
+        "aspect_examples": aspect_examples(col, product_id),
+        "top_positive": top["Positive"],
+        "top_negative": top["Negative"],
+    }
+
+
+# ---------- Backend equivalence check ----------
+def compare_backends(col, product_id):
+    """Run every aggregation through both backends.
+
+    Returns {name: "same" | "differs" | "unsupported"}; "unsupported" means
+    the server (e.g. mongomock, which has no $topN) rejected the pipeline.
+    """
+    checks = {
+        "sentiment_counts": (_sentiment_counts_mongo, _sentiment_counts_python, ()),
+        "aspect_counts": (_aspect_counts_mongo, _aspect_counts_python, ()),
+        "top_reviews": (_top_reviews_mongo, _top_reviews_python, (TOP_K,)),
+        "aspect_examples": (_aspect_examples_mongo, _aspect_examples_python, (ASPECT_EXAMPLES_K,)),
+    }
+    results = {}
+    for name, (mongo_fn, python_fn, extra) in checks.items():
+        try:
+            server = mongo_fn(col, product_id, *extra)
+        except (errors.OperationFailure, NotImplementedError):
+            results[name] = "unsupported"
+            continue
+        results[name] = "same" if server == python_fn(col, product_id, *extra) else "differs"
+    return results
+
+
+def _edge_case_docs(product_id):
+    """Processed docs covering the cases where the backends could disagree."""
+    docs = [
+        {"product_id": product_id, "sentiment": "Positive", "confidence": 0.9, "text": " Great ", "aspects": ["Price"]},
+        {"product_id": product_id, "sentiment": "Positive", "confidence": 0.9, "text": "Tie", "aspects": ["Price"]},
+        {"product_id": product_id, "sentiment": "Positive", "confidence": 1, "text": "Int conf", "aspects": ["Price"]},
+        {"product_id": product_id, "sentiment": "Positive", "confidence": None, "text": "Null conf", "aspects": []},
+        {"product_id": product_id, "sentiment": "Positive", "confidence": 0.2, "text": "No aspects field"},
+        {"product_id": product_id, "sentiment": "Negative", "text": "No conf", "aspects": ["Quality"]},
+        {"product_id": product_id, "sentiment": "Negative", "confidence": 0.4, "aspects": ["Quality"]},
+        {"product_id": product_id, "sentiment": "Neutral", "confidence": 0.0, "text": "  ", "aspects": ["Price"]},
+        {"product_id": product_id, "sentiment": "Neutral", "confidence": 0.1, "text": "", "aspects": ["Quality"]},
+        {"product_id": product_id, "confidence": 0.5, "text": "No sentiment", "aspects": ["Price"]},
+    ]
+    # More equal-confidence reviews than TOP_K / ASPECT_EXAMPLES_K keep, so
+    # the cut falls inside a tie and only the _id tie-break decides it
+    docs += [
+        {"product_id": product_id, "sentiment": "Negative", "confidence": 0.7, "text": f"Tied {i}", "aspects": ["Shipping"]}
+        for i in range(TOP_K + 2)
+    ]
+    return docs
+
+
+def main():
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Check that the Mongo and Python aggregation backends agree.")
+    ap.add_argument("product_ids", nargs="*", help="products to check (default: all)")
+    ap.add_argument("--mongomock", action="store_true",
+                    help="check against an in-memory mongomock collection seeded with edge cases")
+    args = ap.parse_args()
+
+    if args.mongomock:
+        import mongomock
+
+        col = mongomock.MongoClient().db.reviews
+        col.insert_many(_edge_case_docs("edge"))
+        product_ids = ["edge"]
+    else:
+        from services import repository
+
+        col = repository.processed_reviews()
+        product_ids = args.product_ids or col.distinct("product_id")
+
+    failed = False
+    for pid in product_ids:
+        results = compare_backends(col, pid)
+        failed |= "differs" in results.values()
+        print(f"{'❌' if 'differs' in results.values() else '✅'} {pid}: "
+              + ", ".join(f"{k}={v}" for k, v in results.items()))
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    # python -m services.aggregations [product_id ...] | --mongomock
+    main()
@@ -0,0 +1,82 @@
+import re
+
+# =====================================================
+# 🔍 Aspect Matcher — one scan per text
+# =====================================================
+_WORD_RE = re.compile(r"\w+")
+
+
+def table_signature(aspect_keywords: dict):
+    """Hashable snapshot of an aspect → keywords table (detects edits)."""
+    return tuple((aspect, tuple(keywords)) for aspect, keywords in aspect_keywords.items())
+
+
+class AspectMatcher:
+    """Finds every aspect of an ASPECT_KEYWORDS-style table in one pass.
+
+    Plain single-word keywords go into a token → bitmask index, so a text
+    costs one ``\\w+`` tokenization plus one dict lookup per distinct word,
+    no matter how many keywords the table has. ``\\b<kw>\\b`` on a lowered
+    text matches exactly when <kw> is one of its ``\\w+`` runs, so results
+    are the same as the old per-keyword regex loop.
+
+    Multi-word / punctuated keywords ("battery life", "wi-fi") are checked
+    with a word-boundary regex only when all of their words occur in the
+    text, so they too cost nothing for texts that can't contain them.
+    """
+
+    def __init__(self, aspect_keywords: dict):
+        self.aspects = list(aspect_keywords)
+        self.signature = table_signature(aspect_keywords)
+        self._token_masks = {}
+        # first word → [(required words, compiled pattern, bit)]
+        self._phrase_index = {}
+        self._wordless = []
+
+        for bit_index, keywords in enumerate(aspect_keywords.values()):
+            bit = 1 << bit_index
+            for kw in keywords:
+                kw = kw.lower()
+                if _WORD_RE.fullmatch(kw):
+                    self._token_masks[kw] = self._token_masks.get(kw, 0) | bit
+                    continue
+                pattern = re.compile(rf"\b{re.escape(kw)}\b")
+                words = _WORD_RE.findall(kw)
+                if words:
+                    self._phrase_index.setdefault(words[0], []).append((frozenset(words), pattern, bit))
+                else:
+                    self._wordless.append((pattern, bit))
+
+    def matches_table(self, aspect_keywords: dict) -> bool:
+        return self.signature == table_signature(aspect_keywords)
+
+    def mask(self, text: str) -> int:
+        """Bitmask of aspects found in ``text`` (bit i = i-th aspect)."""
+        lowered = text.lower()
+        words = set(_WORD_RE.findall(lowered))
+        token_masks = self._token_masks
+        mask = 0
+        for word in words:
+            mask |= token_masks.get(word, 0)
+
+        if self._phrase_index:
+            for word in words:
+                for required, pattern, bit in self._phrase_index.get(word, ()):
+                    if not mask & bit and required <= words and pattern.search(lowered):
+                        mask |= bit
+        for pattern, bit in self._wordless:
+            if not mask & bit and pattern.search(lowered):
+                mask |= bit
+        return mask
+
+    def names(self, mask: int) -> list:
+        """Decode a bitmask back to aspect names, in table order (cost ∝ set bits)."""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.aspects[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    def match(self, text: str) -> list:
+        return self.names(self.mask(text))
@@ -1,10 +1,15 @@
 import os
 import re
 import time
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse, parse_qs
-from pymongo import MongoClient, errors
+from pymongo import errors
 from dotenv import load_dotenv
+from services.http_client import get_http_client
+from services import repository
+from services.mongo_iter import iter_docs, keyset_page
 import os
 
 BESTBUY_API_KEY = os.getenv("BESTBUY_API_KEY")
@@ -25,19 +30,21 @@ MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB = "review_system"
 MONGO_COLLECTION = "reviews_raw"
 
-API_BASE = "https://api.bestbuy.com/v1/reviews"
+# Overridable so the scraper can be pointed at a local stub server
+API_BASE = os.getenv("BESTBUY_API_BASE", "https://api.bestbuy.com/v1/reviews")
+
+# Page fetch scheduling (BestBuy keys are rate limited per second)
+BESTBUY_RPS = float(os.getenv("BESTBUY_RPS", "4"))
+BESTBUY_WORKERS = int(os.getenv("BESTBUY_WORKERS", "4"))
+BESTBUY_MAX_RETRIES = int(os.getenv("BESTBUY_MAX_RETRIES", "4"))
 
 # -----------------------------------
 # 2️⃣ MongoDB Helper
 # -----------------------------------
 def get_mongo_collection():
-    client = MongoClient(MONGO_URI)
-    db = client[MONGO_DB]
-    col = db[MONGO_COLLECTION]
-
-    # ✅ Safe index for faster lookups
-    col.create_index([("product_id", 1)], name="product_id_index")
-    return col
+    """reviews_raw on the shared client; indexes come from services.repository."""
+    repository.ensure_indexes()
+    return repository.raw_reviews()
 
 # -----------------------------------
 # 3️⃣ SKU Extractor
@@ -85,7 +92,33 @@ def extract_sku(url_or_sku: str) -> str:
 # -----------------------------------
 # 4️⃣ Fetch Reviews
 # -----------------------------------
-def fetch_reviews_page(sku: str, page: int = 1, page_size: int = 10):
+class RateLimiter:
+    """Thread-safe requests-per-second budget shared by all page workers.
+
+    Each acquire() reserves the next free slot; backoff() pushes every
+    future slot back so one 429 slows the whole pool, not just one worker.
+    """
+
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps if rps and rps > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def backoff(self, seconds: float):
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+def fetch_reviews_page(sku: str, page: int = 1, page_size: int = 10, limiter: RateLimiter = None,
+                       retries: int = BESTBUY_MAX_RETRIES):
     params = {
         "apiKey": BESTBUY_API_KEY,
         "format": "json",
@@ -93,18 +126,31 @@ def fetch_reviews_page(sku: str, page: int = 1, page_size: int = 10):
         "pageSize": page_size,
     }
     url = f"{API_BASE}(sku={sku})"
+    if not BESTBUY_API_KEY:
+        # Propagate configuration errors upward for clearer client message
+        raise ValueError("❌ BESTBUY_API_KEY not set in environment. Create a .env with BESTBUY_API_KEY=YOUR_KEY.")
+
     try:
-        if not BESTBUY_API_KEY:
-            raise ValueError("❌ BESTBUY_API_KEY not set in environment. Create a .env with BESTBUY_API_KEY=YOUR_KEY.")
-        r = requests.get(url, params=params, timeout=30)
+        r = get_http_client().get(
+            url, params=params, timeout=30, retries=retries,
+            before_attempt=limiter.acquire if limiter else None,
+            wait=limiter.backoff if limiter else None,
+        )
         r.raise_for_status()
         return r.json()
     except requests.exceptions.RequestException as e:
-        print(f"[ERROR] {e}")
+        print(f"[ERROR] page {page}: {e}")
         return None
-    except ValueError as ve:
-        # Propagate configuration errors upward for clearer client message
-        raise ve
+
+
+def fetch_pages(sku: str, pages, page_size: int = 10, workers: int = BESTBUY_WORKERS,
+                limiter: RateLimiter = None):
+    """Fetch pages on a bounded worker pool; yields (page, data) as each one finishes."""
+    limiter = limiter or RateLimiter(BESTBUY_RPS)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(fetch_reviews_page, sku, p, page_size, limiter): p for p in pages}
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result()
 
 # -----------------------------------
 # 5️⃣ Normalize Review Object
@@ -127,89 +173,139 @@ def normalize_review(r: dict, sku: str) -> dict:
 # 6️⃣ Save to MongoDB
 # -----------------------------------
 def save_reviews_to_mongo(reviews: list):
+    """Write one page of reviews with a single unordered insert_many.
+
+    Already-stored reviews are rejected by the unique (product_id, id) index
+    and skipped; returns the number of newly inserted reviews.
+    """
+    if not reviews:
+        return 0
     col = get_mongo_collection()
-    inserted = 0
     for r in reviews:
-        try:
-            if not col.find_one({"product_id": r["product_id"], "text": r["text"]}):
-                col.insert_one(r)
-                inserted += 1
-        except errors.DuplicateKeyError:
-            continue
-    return inserted
+        # A null id would collide on the unique index; leave it out instead
+        if r.get("id") is None:
+            r.pop("id", None)
+    try:
+        result = col.insert_many(reviews, ordered=False)
+        return len(result.inserted_ids)
+    except errors.BulkWriteError as bwe:
+        write_errors = bwe.details.get("writeErrors", [])
+        if any(e.get("code") != 11000 for e in write_errors):
+            raise
+        return bwe.details.get("nInserted", 0)
 
 # -----------------------------------
 # 7️⃣ Scraper with Caching
 # -----------------------------------
-def scrape_and_store_reviews(link_or_sku: str, page_size: int = 10, delay: float = 1.0):
+def _normalize_cached(doc: dict, sku: str) -> dict:
+    return {
+        "id": doc.get("id"),
+        "sku": sku,
+        "product_id": doc.get("product_id") or sku,
+        "source": doc.get("source", "bestbuy"),
+        "reviewer": (doc.get("reviewer") or "Anonymous"),
+        "rating": doc.get("rating"),
+        "title": doc.get("title"),
+        "text": doc.get("text") or doc.get("comment") or "",
+        "date": doc.get("date") or doc.get("submissionTime", ""),
+    }
+
+
+def iter_cached_reviews(sku: str, batch_size: int = None):
+    """Stream a SKU's stored reviews in the normalized response shape."""
+    for doc in iter_docs(get_mongo_collection(), {"sku": sku}, batch_size=batch_size, sort=[("_id", 1)]):
+        yield _normalize_cached(doc, sku)
+
+
+# Response fields that older stored docs keep under another name
+_LEGACY_FIELDS = {"text": ("text", "comment"), "date": ("date", "submissionTime")}
+
+
+def cached_reviews_page(sku: str, limit: int, after=None, projection=None):
+    """Keyset-paginated stored reviews for a SKU (see mongo_iter.keyset_page).
+
+    Reviews have the same shape as iter_cached_reviews(); ``projection``
+    ({field: 1}) picks response fields. _id is only used for next_after.
+    """
+    stored = None
+    if projection:
+        stored = {src: 1 for f in projection for src in _LEGACY_FIELDS.get(f, (f,))}
+    docs, next_after = keyset_page(get_mongo_collection(), {"sku": sku}, limit, after, stored)
+    reviews = [_normalize_cached(d, sku) for d in docs]
+    if projection:
+        reviews = [{f: r[f] for f in projection} for r in reviews]
+    return reviews, next_after
+
+
+def scrape_and_store_reviews(link_or_sku: str, page_size: int = 10, delay: float = None,
+                             workers: int = BESTBUY_WORKERS, collect: bool = True):
+    """Fetch every review page for a SKU and stream each page into Mongo.
+
+    Pages are fetched concurrently within the BESTBUY_RPS budget (or one
+    request per ``delay`` seconds when given). With ``collect=False`` no
+    reviews are kept in memory and the stored review count is returned
+    instead; read them back with iter_cached_reviews().
+    """
     col = get_mongo_collection()
     sku = extract_sku(link_or_sku)
 
     # ✅ Step 1: Check Mongo cache
-    existing = list(col.find({"sku": sku}))
-    if existing:
-        print(f"💾 Found {len(existing)} cached reviews for SKU {sku}. Skipping API call.")
+    if col.find_one({"sku": sku}, {"_id": 1}):
         # 🔧 Ensure cached docs have product_id set (backfill old records)
-        needs_backfill = any("product_id" not in doc or not doc.get("product_id") for doc in existing)
-        if needs_backfill:
+        if col.find_one({"sku": sku, "product_id": None}, {"_id": 1}):
             try:
                 col.update_many({"sku": sku, "product_id": {"$exists": False}}, {"$set": {"product_id": sku}})
                 col.update_many({"sku": sku, "product_id": None}, {"$set": {"product_id": sku}})
                 print(f"🛠️ Backfilled product_id for cached SKU {sku}.")
             except Exception as e:
                 print(f"⚠️ Backfill failed for SKU {sku}: {e}")
-            # Refresh cache after backfill
-            existing = list(col.find({"sku": sku}))
+        if not collect:
+            count = col.count_documents({"sku": sku})
+            print(f"💾 Found {count} cached reviews for SKU {sku}. Skipping API call.")
+            return count
         # ✅ Normalize shape for response
-        normalized_existing = [
-            {
-                "id": doc.get("id"),
-                "sku": sku,
-                "product_id": doc.get("product_id") or sku,
-                "source": doc.get("source", "bestbuy"),
-                "reviewer": (doc.get("reviewer") or "Anonymous"),
-                "rating": doc.get("rating"),
-                "title": doc.get("title"),
-                "text": doc.get("text") or doc.get("comment") or "",
-                "date": doc.get("date") or doc.get("submissionTime", ""),
-            }
-            for doc in existing
-        ]
+        normalized_existing = list(iter_cached_reviews(sku))
+        print(f"💾 Found {len(normalized_existing)} cached reviews for SKU {sku}. Skipping API call.")
         return normalized_existing
 
     print(f"🆔 Extracted SKU: {sku}")
     print(f"🔍 No cache found — Fetching reviews using BestBuy Developer API...\n")
 
     # ✅ Step 2: Fetch from API
-    data = fetch_reviews_page(sku, 1, page_size)
+    limiter = RateLimiter(1.0 / delay if delay else BESTBUY_RPS)
+    data = fetch_reviews_page(sku, 1, page_size, limiter)
     if not data:
         print("❌ Failed to fetch first page.")
-        return []
+        return [] if collect else 0
 
     total = data.get("total", 0)
     total_pages = data.get("totalPages", 1)
     print(f"✅ Total reviews: {total} | Total pages: {total_pages}\n")
 
-    all_reviews = []
+    by_page = {}
     inserted_total = 0
 
-    for page in range(1, total_pages + 1):
-        d = fetch_reviews_page(sku, page, page_size)
+    def store(page, d):
+        nonlocal inserted_total
         if not d:
             print(f"⚠️ Skipping page {page}")
-            continue
-
-        reviews = d.get("reviews", [])
-        normalized = [normalize_review(r, sku) for r in reviews]
+            return
+        normalized = [normalize_review(r, sku) for r in d.get("reviews", [])]
         inserted = save_reviews_to_mongo(normalized)
         inserted_total += inserted
-        all_reviews.extend(normalized)
+        if collect:
+            by_page[page] = normalized
         print(f"📄 Page {page}/{total_pages} | Inserted: {inserted}")
 
-        time.sleep(delay)
+    # Page 1 is already in hand; the rest are fetched concurrently
+    store(1, data)
+    for page, d in fetch_pages(sku, range(2, total_pages + 1), page_size, workers, limiter):
+        store(page, d)
 
     print(f"\n✅ Done. Total {inserted_total} new reviews added for SKU {sku}.")
-    return all_reviews
+    if not collect:
+        return col.count_documents({"sku": sku})
+    return [r for page in sorted(by_page) for r in by_page[page]]
 
 # -----------------------------------
 # 8️⃣ CLI Entry
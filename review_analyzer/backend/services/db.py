@@ -0,0 +1,79 @@
+import os
+import threading
+from pymongo import MongoClient
+
+# =====================================================
+# 🗄️ Shared MongoDB client (created on first use)
+# =====================================================
+# Importing a service module never opens a connection. The client is
+# rebuilt after fork (gunicorn workers, multiprocessing pools), since a
+# MongoClient must not be shared across processes.
+RAW_DB = "review_system"
+PROCESSED_DB = "review_system_processed"
+
+# Pool sizing is per process: with gunicorn, total connections ≈
+# workers × (MONGO_MAX_POOL_SIZE + monitor sockets).
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "60000"))
+MONGO_READ_CONCERN = os.getenv("MONGO_READ_CONCERN", "local")
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+MONGO_WRITE_CONCERN = os.getenv("MONGO_WRITE_CONCERN", "1")  # "1", "majority", ...
+MONGO_JOURNAL = os.getenv("MONGO_JOURNAL", "").lower() in ("1", "true", "yes")
+MONGO_APPNAME = os.getenv("MONGO_APPNAME", "review-analyzer")
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def client_options() -> dict:
+    """MongoClient keyword options built from the MONGO_* settings."""
+    w = int(MONGO_WRITE_CONCERN) if MONGO_WRITE_CONCERN.isdigit() else MONGO_WRITE_CONCERN
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "readConcernLevel": MONGO_READ_CONCERN,
+        "readPreference": MONGO_READ_PREFERENCE,
+        "w": w,
+        "appname": MONGO_APPNAME,
+    }
+    if MONGO_JOURNAL:
+        options["journal"] = True
+    return options
+
+
+def get_client() -> MongoClient:
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = MongoClient(os.getenv("MONGO_URI"), **client_options())
+                _client_pid = os.getpid()
+    return _client
+
+
+def close_client():
+    """Close this process's client (shutdown hooks / tests); the next call reconnects."""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = _client_pid = None
+
+
+def raw_db():
+    return get_client()[RAW_DB]
+
+
+def processed_db():
+    return get_client()[PROCESSED_DB]
@@ -3,9 +3,14 @@ import json
 import os
 import re
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup
-from pymongo import MongoClient
-import os
+from services.http_client import get_http_client
+from services import repository
+from services.feedback_parser import extract_cards, extract_seller_name
+from services.mongo_iter import iter_docs, iter_field, keyset_page
+from services.review_archive import append_reviews
 
 BESTBUY_API_KEY = os.getenv("BESTBUY_API_KEY")
 SCRAPER_API_KEY = os.getenv("SCRAPER_API_KEY")
@@ -19,15 +24,11 @@ SAVE_DIR = "data"
 os.makedirs(SAVE_DIR, exist_ok=True)
 
 MONGO_URI = os.getenv("MONGO_URI")
-client = MongoClient(MONGO_URI)
-# try:
-#     client.admin.command("ping")
-#     print("✅ MongoDB connection successful.")
-# except Exception as e:
-#     print("❌ MongoDB connection failed:", e)
-raw_db = client["review_system"]
-raw_collection = raw_db["reviews_raw"]
-title_collection = raw_db["product_titles"]
+
+
+# Collections are owned by services.repository (shared lazy client)
+raw_collection = repository.raw_reviews
+title_collection = repository.product_titles
 
 
 # ---------- HELPERS ----------
@@ -35,123 +36,165 @@ def extract_product_id(url: str):
     match = re.search(r"/itm/(\d+)", url)
     return match.group(1) if match else "unknown"
 
-def safe_get(url, render=False, retries=3):
-    """Uses ScraperAPI with retries and optional JS rendering"""
+class Cancelled(Exception):
+    """A request was stopped because its ``stop`` event was set."""
+
+
+def safe_get(url, render=False, retries=3, stop=None):
+    """Uses ScraperAPI with retries and optional JS rendering.
+
+    With ``stop`` (a threading.Event) set, no further attempt is made and
+    the backoff sleep between retries ends early; the call returns None.
+    """
     params = {
         "api_key": SCRAPER_API_KEY,
         "url": url
     }
     if render:
         params["render"] = "true"
-    for i in range(retries):
-        try:
-            resp = requests.get(SCRAPER_BASE, params=params, timeout=60)
-            if resp.status_code == 200:
-                return resp
-            else:
-                print(f"⚠️ HTTP {resp.status_code}, retry {i+1}")
-        except requests.RequestException as e:
-            print(f"⚠️ {e}, retry {i+1}")
-        time.sleep(2)
+    hooks = {}
+    if stop is not None:
+        def check_stop():
+            if stop.is_set():
+                raise Cancelled(url)
+        hooks = {"before_attempt": check_stop, "wait": stop.wait}
+    try:
+        # Pooled keep-alive session; retries 429/5xx with jittered backoff
+        resp = get_http_client().get(SCRAPER_BASE, params=params, timeout=60, retries=retries - 1, **hooks)
+    except Cancelled:
+        return None
+    except requests.RequestException as e:
+        print(f"⚠️ {e}")
+        return None
+    if resp.status_code == 200:
+        return resp
+    print(f"⚠️ HTTP {resp.status_code} for {url}")
     return None
 
+# ---------- FALLBACK STRATEGIES ----------
+def _fetch_feedback_page(url: str, product_id: str, source: str, stop=None):
+    resp = safe_get(url, stop=stop)
+    if not resp:
+        return []
+    return extract_cards(resp.text, product_id, source)
+
+
+def strategy_mweb_profile(product_id: str, seller_name: str, stop=None):
+    """Item feedback via the mweb_profile endpoint."""
+    mweb_url = (
+        f"https://www.ebay.com/fdbk/mweb_profile?"
+        f"fdbkType=FeedbackReceivedAsSeller&item_id={product_id}"
+        f"&username={seller_name}&filter=feedback_page:RECEIVED_AS_SELLER"
+        f"&q={product_id}&sort=RELEVANCEV2"
+    )
+    return _fetch_feedback_page(mweb_url, product_id, "mweb_profile", stop)
+
+
+def strategy_seller_feedback(product_id: str, seller_name: str, stop=None):
+    """Seller feedback profile page."""
+    fb_url = f"https://www.ebay.com/fdbk/feedback_profile/{seller_name}?filter=feedback_page:RECEIVED_AS_SELLER"
+    return _fetch_feedback_page(fb_url, product_id, "seller_feedback_profile", stop)
+
+
+FALLBACK_STRATEGIES = [
+    ("mweb_profile", strategy_mweb_profile),
+    ("seller_feedback_profile", strategy_seller_feedback),
+]
+
+
+def run_strategies_concurrently(strategies, *args):
+    """Run (name, fn) strategies in parallel; the first non-empty result wins.
+
+    Each strategy is called as ``fn(*args, stop=event)`` and must pass the
+    event down to safe_get. The event is set as soon as a winner arrives,
+    so the others stop before their next request or retry instead of
+    spending the per-host budget on results nobody reads. Returns (reviews,
+    report) where report maps each strategy to its status (won / done /
+    empty / error / cancelled), review count and latency (for cancelled
+    ones, how long they had run when the winner arrived).
+    """
+    report = {name: {"status": "running", "count": 0, "latency_s": None} for name, _ in strategies}
+    if not strategies:
+        return [], report
+    lock = threading.Lock()
+    stop = threading.Event()
+    started = time.monotonic()
+
+    def timed(name, fn):
+        status, count = "error", 0
+        try:
+            result = fn(*args, stop=stop)
+            status, count = ("done" if result else "empty"), len(result)
+            return result
+        except Exception as e:
+            print(f"⚠️ {name} failed: {e}")
+            return []
+        finally:
+            with lock:
+                if report[name]["status"] == "running":
+                    report[name].update(status=status, count=count,
+                                        latency_s=round(time.monotonic() - started, 3))
+
+    pool = ThreadPoolExecutor(max_workers=len(strategies))
+    futures = {pool.submit(timed, name, fn): name for name, fn in strategies}
+    winner = []
+    try:
+        for fut in as_completed(futures):
+            result = fut.result()
+            if result:
+                winner = result
+                with lock:
+                    report[futures[fut]]["status"] = "won"
+                    elapsed = round(time.monotonic() - started, 3)
+                    for r in report.values():
+                        if r["status"] == "running":
+                            r.update(status="cancelled", latency_s=elapsed)
+                break
+    finally:
+        stop.set()
+        pool.shutdown(wait=False)
+
+    with lock:
+        return winner, {name: dict(r) for name, r in report.items()}
+
+
 # ---------- CORE SCRAPER ----------
 def fetch_ebay_reviews(product_url: str, max_pages: int = 2):
-    """Hybrid scraper: product page → mweb_profile → seller feedback"""
+    """Hybrid scraper: product page → (mweb_profile | seller feedback) in parallel"""
     product_id = extract_product_id(product_url)
     all_reviews = []
+    product_html = None
+    resp = None
 
     # ===== STEP 1: PRODUCT PAGE (old working approach) =====
     print(f"🔎 Trying product page (ScraperAPI HTML) for {product_id}")
     for page in range(1, max_pages + 1):
         url = f"{product_url}?pgn={page}"
-        resp = safe_get(url)
-        if not resp:
+        page_resp = safe_get(url)
+        if not page_resp:
             break
-        soup = BeautifulSoup(resp.text, "html.parser")
-        cards = soup.select("li.fdbk-container")
+        if product_html is None:
+            # Page 1 doubles as the product page for the seller lookup below
+            resp, product_html = page_resp, page_resp.text
+        cards = extract_cards(page_resp.text, product_id, "ebay_product_html")
         print(f"👉 Found {len(cards)} reviews on page {page}")
-        for card in cards:
-            reviewer = card.select_one(".fdbk-container__details__info__username span")
-            text_elem = card.select_one(".fdbk-container__details__comment span")
-            date_elem = card.select_one(".fdbk-container__details__info__divide__time span")
-            if text_elem and text_elem.text.strip():
-                all_reviews.append({
-                    "product_id": product_id,
-                    "source": "ebay_product_html",
-                    "reviewer": reviewer.text.strip() if reviewer else "Anonymous",
-                    "text": text_elem.text.strip(),
-                    "date": date_elem.text.strip() if date_elem else ""
-                })
+        all_reviews.extend(cards)
         if cards:
             break
 
-    # ===== STEP 2: MWB PROFILE (item feedback API) =====
+    # ===== STEP 2+3: MWB PROFILE / SELLER FEEDBACK, CONCURRENTLY =====
     if not all_reviews:
-        print("⚠️ No reviews in product HTML. Trying mweb_profile endpoint...")
-        try:
+        print("⚠️ No reviews in product HTML. Trying mweb_profile + seller feedback in parallel...")
+        if product_html is None:
             resp = safe_get(product_url)
-            soup = BeautifulSoup(resp.text, "html.parser")
-            seller_elem = soup.select_one("a[href*='/usr/']")
-            if seller_elem:
-                seller_name = seller_elem["href"].split("/usr/")[-1]
-                mweb_url = (
-                    f"https://www.ebay.com/fdbk/mweb_profile?"
-                    f"fdbkType=FeedbackReceivedAsSeller&item_id={product_id}"
-                    f"&username={seller_name}&filter=feedback_page:RECEIVED_AS_SELLER"
-                    f"&q={product_id}&sort=RELEVANCEV2"
-                )
-                print(f"🔎 Fetching mweb_profile for {seller_name}")
-                resp2 = safe_get(mweb_url)
-                if resp2:
-                    soup2 = BeautifulSoup(resp2.text, "html.parser")
-                    cards = soup2.select("li.fdbk-container")
-                    print(f"👉 Found {len(cards)} reviews in mweb_profile")
-                    for card in cards:
-                        reviewer = card.select_one(".fdbk-container__details__info__username span")
-                        text_elem = card.select_one(".fdbk-container__details__comment span")
-                        date_elem = card.select_one(".fdbk-container__details__info__divide__time span")
-                        if text_elem and text_elem.text.strip():
-                            all_reviews.append({
-                                "product_id": product_id,
-                                "source": "mweb_profile",
-                                "reviewer": reviewer.text.strip() if reviewer else "Anonymous",
-                                "text": text_elem.text.strip(),
-                                "date": date_elem.text.strip() if date_elem else ""
-                            })
-        except Exception as e:
-            print(f"⚠️ MWB Profile failed: {e}")
-
-    # ===== STEP 3: SELLER FEEDBACK PAGE =====
-    if not all_reviews:
-        print("⚠️ No reviews yet. Trying seller feedback profile page...")
-        try:
-            resp = safe_get(product_url)
-            soup = BeautifulSoup(resp.text, "html.parser")
-            seller_elem = soup.select_one("a[href*='/usr/']")
-            if seller_elem:
-                seller_name = seller_elem["href"].split("/usr/")[-1]
-                fb_url = f"https://www.ebay.com/fdbk/feedback_profile/{seller_name}?filter=feedback_page:RECEIVED_AS_SELLER"
-                print(f"🔎 Fetching {fb_url}")
-                resp3 = safe_get(fb_url)
-                if resp3:
-                    soup3 = BeautifulSoup(resp3.text, "html.parser")
-                    cards = soup3.select("li.fdbk-container")
-                    print(f"👉 Found {len(cards)} reviews in seller feedback")
-                    for card in cards:
-                        reviewer = card.select_one(".fdbk-container__details__info__username span")
-                        text_elem = card.select_one(".fdbk-container__details__comment span")
-                        date_elem = card.select_one(".fdbk-container__details__info__divide__time span")
-                        if text_elem and text_elem.text.strip():
-                            all_reviews.append({
-                                "product_id": product_id,
-                                "source": "seller_feedback_profile",
-                                "reviewer": reviewer.text.strip() if reviewer else "Anonymous",
-                                "text": text_elem.text.strip(),
-                                "date": date_elem.text.strip() if date_elem else ""
-                            })
-        except Exception as e:
-            print(f"⚠️ Seller feedback failed: {e}")
+            product_html = resp.text if resp else None
+        seller_name = extract_seller_name(product_html)
+        if seller_name:
+            print(f"🔎 Seller: {seller_name}")
+            all_reviews, report = run_strategies_concurrently(FALLBACK_STRATEGIES, product_id, seller_name)
+            for name, r in report.items():
+                latency = f"{r['latency_s']}s" + (" so far" if r["status"] == "cancelled" else "")
+                print(f"⏱️ {name}: {r['status']} | {r['count']} reviews | {latency}")
 
     # ===== STEP 4: SAVE DEBUG IF ALL FAIL =====
     if not all_reviews:
@@ -172,28 +215,24 @@ def fetch_ebay_reviews(product_url: str, max_pages: int = 2):
     return unique
 
 def save_reviews(product_id: str, reviews: list):
-    """Save reviews to JSON file and MongoDB (deduplicated + product_id added)."""
-    # 1️⃣ Save locally
-    path = os.path.join(SAVE_DIR, f"ebay_reviews_{product_id}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(reviews, f, indent=2, ensure_ascii=False)
-    print(f"💾 Saved {len(reviews)} reviews → {path}")
-
-    # 2️⃣ Ensure all reviews have product_id field
+    """Archive reviews locally and save to MongoDB (deduplicated + product_id added)."""
+    # 1️⃣ Ensure all reviews have product_id field
     for r in reviews:
         r["product_id"] = product_id
 
+    # 2️⃣ Append to the compressed per-product archive
+    path = append_reviews("ebay", product_id, reviews)
+    print(f"💾 Archived {len(reviews)} reviews → {path}")
+
     # 3️⃣ Find existing review texts for this product
-    existing_texts = set(
-        r["text"] for r in raw_collection.find({"product_id": product_id}, {"text": 1})
-    )
+    existing_texts = set(iter_field(raw_collection(), {"product_id": product_id}, "text"))
 
     # 4️⃣ Filter only new reviews (by text)
     new_reviews = [r for r in reviews if r["text"] not in existing_texts]
 
     # 5️⃣ Insert new reviews if any
     if new_reviews:
-        raw_collection.insert_many(new_reviews)
+        raw_collection().insert_many(new_reviews)
         print(f"✅ Inserted {len(new_reviews)} new reviews into MongoDB for {product_id}")
     else:
         print(f"💾 No new reviews to insert for {product_id} (all duplicates skipped).")
@@ -213,13 +252,38 @@ def save_reviews(product_id: str, reviews: list):
 #     print(f"✅ Inserted {inserted} new reviews into MongoDB")
 
 
-def fetch_and_save_reviews(product_url: str):
-    """Streamlit-compatible function"""
+def iter_raw_reviews(product_id: str, projection=None, batch_size: int = None):
+    """Stream a product's stored raw reviews in insertion order."""
+    return iter_docs(raw_collection(), {"product_id": product_id}, projection, batch_size, sort=[("_id", 1)])
+
+
+def raw_reviews_page(product_id: str, limit: int, after=None, projection=None):
+    """Keyset-paginated stored reviews for a product (see mongo_iter.keyset_page).
+
+    Like cached_reviews_page, _id is only used for next_after and is not
+    part of the returned reviews.
+    """
+    docs, next_after = keyset_page(raw_collection(), {"product_id": product_id}, limit, after, projection)
+    for d in docs:
+        d.pop("_id", None)
+    return docs, next_after
+
+
+def fetch_and_save_reviews(product_url: str, collect: bool = True):
+    """Streamlit-compatible function
+
+    With ``collect=False`` the stored review count is returned instead of
+    the reviews; read them back with iter_raw_reviews().
+    """
     
     product_id = extract_product_id(product_url)
      # 1️⃣ Check if product already exists in MongoDB
-    existing_reviews = list(raw_collection.find({"product_id": product_id}))
-    if existing_reviews:
+    if raw_collection().find_one({"product_id": product_id}, {"_id": 1}):
+        if not collect:
+            count = raw_collection().count_documents({"product_id": product_id})
+            print(f"💾 Found {count} cached reviews for product_id {product_id}. Skipping scrape.")
+            return count
+        existing_reviews = list(iter_raw_reviews(product_id))
         print(f"💾 Found {len(existing_reviews)} cached reviews for product_id {product_id}. Skipping scrape.")
         return existing_reviews
     else:
@@ -229,10 +293,10 @@ def fetch_and_save_reviews(product_url: str):
     reviews = fetch_ebay_reviews(product_url)
     if reviews:
         save_reviews(product_id, reviews)
-        return reviews
+        return reviews if collect else raw_collection().count_documents({"product_id": product_id})
     else:
         print("❌ No reviews found.")
-        return []
+        return [] if collect else 0
 
 def fetch_product_title(product_url: str) -> str:
     """Fetch product title from an eBay item page with MongoDB caching."""
@@ -240,7 +304,7 @@ def fetch_product_title(product_url: str) -> str:
         product_id = extract_product_id(product_url)
 
         # 🔹 Check if title already cached
-        existing = title_collection.find_one({"product_id": product_id})
+        existing = title_collection().find_one({"product_id": product_id})
         if existing and existing.get("title"):
             print(f"💾 Cached title found for {product_id}")
             return existing["title"]
@@ -267,7 +331,7 @@ def fetch_product_title(product_url: str) -> str:
 
         # 🔹 Cache the title in MongoDB
         title_doc = {"product_id": product_id, "title": title}
-        title_collection.update_one({"product_id": product_id}, {"$set": title_doc}, upsert=True)
+        title_collection().update_one({"product_id": product_id}, {"$set": title_doc}, upsert=True)
         print(f"✅ Cached title for {product_id}: {title}")
         return title
 
@@ -0,0 +1,212 @@
+import os
+import re
+from collections import Counter
+
+# =====================================================
+# ✂️ Extractive Summary (TF-IDF + LexRank + MMR)
+# =====================================================
+# Picks whole review sentences instead of generating text, so it needs no
+# model and runs in milliseconds on thousands of reviews:
+#   1. split reviews into sentences, drop very short/long ones and repeats
+#   2. TF-IDF vectors as a CSR matrix X (rows L2-normalized)
+#   3. LexRank centrality by power iteration on the cosine graph S = X·Xᵀ,
+#      computed as X·(Xᵀ·v) so the n×n matrix is never built
+#   4. greedy MMR over the most central sentences: centrality minus
+#      similarity to what is already picked, plus a bonus for covering an
+#      aspect (Price, Quality, ...) no picked sentence mentions yet
+# numpy is imported inside the functions that need it, so importing this
+# module (and the app) doesn't pay for it until the first extractive summary.
+EXTRACTIVE_SENTENCES = int(os.getenv("EXTRACTIVE_SENTENCES", "6"))
+EXTRACTIVE_MAX_CHARS = int(os.getenv("EXTRACTIVE_MAX_CHARS", "1500"))
+EXTRACTIVE_CANDIDATES = int(os.getenv("EXTRACTIVE_CANDIDATES", "200"))
+
+MIN_SENTENCE_CHARS = 20
+MAX_SENTENCE_CHARS = 400
+DAMPING = 0.85
+MMR_LAMBDA = 0.7
+ASPECT_BONUS = 0.3
+# A candidate this similar (cosine) to a picked sentence is a restatement
+MAX_REDUNDANCY = 0.9
+
+_TOKEN_RE = re.compile(r"[a-z][a-z']+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by can
+could did do does doing don't down during each even few for from get got had has have having he
+her here hers him his how i i'm i've if in into is it it's its just me more most my no nor not
+now of off on once only or other our out over own really same she should so some still such than
+that the their them then there these they this those through to too under until up us very was
+we were what when where which while who why will with would you your
+""".split())
+
+
+def split_sentences(text: str):
+    return [t for t in (p.strip() for p in _SENTENCE_RE.split(text or "")) if t]
+
+
+def _candidate_sentences(texts):
+    """Usable sentences in review order, first occurrence of each only."""
+    seen, out = set(), []
+    for text in texts:
+        for sentence in split_sentences(text):
+            if not MIN_SENTENCE_CHARS <= len(sentence) <= MAX_SENTENCE_CHARS:
+                continue
+            # Same words = same sentence, whatever the punctuation or spacing
+            key = " ".join(_TOKEN_RE.findall(sentence.lower())) or sentence
+            if key not in seen:
+                seen.add(key)
+                out.append(sentence)
+    return out
+
+
+def tfidf_matrix(sentences):
+    """L2-normalized TF-IDF rows as CSR arrays (indptr, indices, data).
+
+    Sentences with no content words get an empty row; ``keep`` marks the
+    non-empty ones.
+    """
+    import numpy as np
+
+    vocab = {}
+    indptr, indices, counts = [0], [], []
+    findall = _TOKEN_RE.findall
+    for sentence in sentences:
+        tf = Counter(findall(sentence.lower()))
+        for word in STOPWORDS.intersection(tf):
+            del tf[word]
+        indices.extend([vocab.setdefault(tok, len(vocab)) for tok in tf])
+        counts.extend(tf.values())
+        indptr.append(len(indices))
+
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int64)
+    data = np.asarray(counts, dtype=np.float64)
+    n = len(sentences)
+
+    df = np.bincount(indices, minlength=len(vocab))
+    idf = np.log((1 + n) / (1 + df)) + 1.0
+    data = (1.0 + np.log(data)) * idf[indices] if data.size else data
+
+    lengths = np.diff(indptr)
+    rows = np.repeat(np.arange(n), lengths)
+    norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=n))
+    keep = lengths > 0
+    if data.size:
+        data = data / norms[rows]
+    return indptr, indices, data, keep
+
+
+def _matvec(indptr, indices, data, v):
+    """X·v for CSR X (rows with no entries give 0)."""
+    import numpy as np
+
+    out = np.zeros(len(indptr) - 1)
+    if data.size:
+        products = data * v[indices]
+        nonempty = indptr[:-1] < indptr[1:]
+        out[nonempty] = np.add.reduceat(products, indptr[:-1][nonempty])
+    return out
+
+
+def _rmatvec(indptr, indices, data, u, n_cols):
+    """Xᵀ·u for CSR X."""
+    import numpy as np
+
+    return np.bincount(indices, weights=data * np.repeat(u, np.diff(indptr)), minlength=n_cols)
+
+
+def lexrank(indptr, indices, data, keep, max_iter: int = 50, tol: float = 1e-6):
+    """Continuous LexRank scores (sum to 1 over ``keep`` rows).
+
+    The cosine graph is S = X·Xᵀ minus self-loops; each S·v costs one pass
+    over the non-zeros of X instead of n² similarities.
+    """
+    import numpy as np
+
+    n_cols = int(indices.max()) + 1 if indices.size else 0
+
+    def similarity(v):
+        return _matvec(indptr, indices, data, _rmatvec(indptr, indices, data, v, n_cols)) - v * keep
+
+    degree = similarity(keep.astype(np.float64))
+    degree[degree <= 0] = 1.0
+    k = int(keep.sum())
+    p = keep / k
+    for _ in range(max_iter):
+        nxt = ((1 - DAMPING) / k) * keep + DAMPING * similarity(p / degree)
+        if np.abs(nxt - p).sum() < tol:
+            return nxt
+        p = nxt
+    return p
+
+
+def _dense_rows(indptr, indices, data, rows):
+    """Dense copy of the (non-empty) selected rows, restricted to the columns they use."""
+    import numpy as np
+
+    spans = np.concatenate([np.arange(indptr[r], indptr[r + 1]) for r in rows])
+    uniq, local = np.unique(indices[spans], return_inverse=True)
+    dense = np.zeros((len(rows), len(uniq)))
+    dense[np.repeat(np.arange(len(rows)), np.diff(indptr)[rows]), local] = data[spans]
+    return dense
+
+
+def select_sentences(sentences, scores, dense, masks, max_sentences: int, max_chars: int):
+    """Greedy MMR with an aspect-coverage bonus; returns picked positions.
+
+    Candidates at MAX_REDUNDANCY or more similarity to a picked sentence are
+    dropped outright: the MMR penalty alone is too weak to keep a near copy
+    of a very central sentence out.
+    """
+    import numpy as np
+
+    relevance = scores / (scores.max() or 1.0)
+    sims = dense @ dense.T
+    masks = np.asarray(masks, dtype=np.int64)
+    max_sim = np.zeros(len(sentences))
+    available = np.ones(len(sentences), dtype=bool)
+    picked, covered, used = [], 0, 0
+    while len(picked) < max_sentences and available.any():
+        new_aspect = (masks & ~covered) != 0
+        mmr = MMR_LAMBDA * relevance - (1 - MMR_LAMBDA) * max_sim + ASPECT_BONUS * new_aspect
+        mmr[~available] = -np.inf
+        i = int(np.argmax(mmr))
+        available[i] = False
+        if picked and used + len(sentences[i]) > max_chars:
+            continue  # too long for what's left; a shorter one may still fit
+        picked.append(i)
+        used += len(sentences[i]) + 1
+        covered |= int(masks[i])
+        max_sim = np.maximum(max_sim, sims[i])
+        available &= max_sim < MAX_REDUNDANCY
+    return picked
+
+
+def extractive_summary(texts, matcher=None, max_sentences: int = EXTRACTIVE_SENTENCES,
+                       max_chars: int = EXTRACTIVE_MAX_CHARS, candidates: int = EXTRACTIVE_CANDIDATES):
+    """Representative sentences from ``texts``, most central first.
+
+    ``matcher`` is an AspectMatcher; when given, sentences that bring a not
+    yet covered aspect are preferred so the summary isn't all about one.
+    """
+    import numpy as np
+
+    sentences = _candidate_sentences(texts)
+    if not sentences:
+        return ""
+    indptr, indices, data, keep = tfidf_matrix(sentences)
+    if not keep.any():
+        return " ".join(sentences[:max_sentences])[:max_chars]
+
+    scores = lexrank(indptr, indices, data, keep)
+    # MMR only needs to look at the head of the ranking
+    top = np.argsort(-scores, kind="stable")[:candidates]
+    top = top[keep[top]]
+    top_sentences = [sentences[i] for i in top]
+    masks = [matcher.mask(s) for s in top_sentences] if matcher else [0] * len(top)
+    dense = _dense_rows(indptr, indices, data, top)
+
+    picked = select_sentences(top_sentences, scores[top], dense, masks, max_sentences, max_chars)
+    summary = " ".join(top_sentences[i] for i in picked)
+    return summary if len(summary) <= max_chars else summary[:max_chars].rsplit(" ", 1)[0] + "…"
@@ -0,0 +1,125 @@
+import os
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # lxml is optional; fall back to bs4 + SoupStrainer
+    lxml_html = None
+
+# ---------- CONFIG ----------
+# auto | lxml | strainer | full
+EBAY_CARD_EXTRACTOR = os.getenv("EBAY_CARD_EXTRACTOR", "auto")
+
+CARD_SELECTOR = "li.fdbk-container"
+REVIEWER_SELECTOR = ".fdbk-container__details__info__username span"
+TEXT_SELECTOR = ".fdbk-container__details__comment span"
+DATE_SELECTOR = ".fdbk-container__details__info__divide__time span"
+
+_CARD_STRAINER = SoupStrainer("li", class_="fdbk-container")
+_SELLER_STRAINER = SoupStrainer("a", href=re.compile("/usr/"))
+
+
+def _review(product_id, source, reviewer, text, date):
+    return {
+        "product_id": product_id,
+        "source": source,
+        "reviewer": reviewer or "Anonymous",
+        "text": text,
+        "date": date or "",
+    }
+
+
+# ---------- BS4 BACKENDS ----------
+def _cards_from_soup(soup, product_id, source):
+    reviews = []
+    for card in soup.select(CARD_SELECTOR):
+        reviewer = card.select_one(REVIEWER_SELECTOR)
+        text_elem = card.select_one(TEXT_SELECTOR)
+        date_elem = card.select_one(DATE_SELECTOR)
+        if text_elem and text_elem.text.strip():
+            reviews.append(_review(
+                product_id, source,
+                reviewer.text.strip() if reviewer else None,
+                text_elem.text.strip(),
+                date_elem.text.strip() if date_elem else None,
+            ))
+    return reviews
+
+
+def _cards_full(html, product_id, source):
+    """Reference path: parse the whole page with html.parser (the original scraper)."""
+    return _cards_from_soup(BeautifulSoup(html, "html.parser"), product_id, source)
+
+
+def _cards_strainer(html, product_id, source):
+    """Only build the tree for li.fdbk-container subtrees."""
+    parser = "lxml" if lxml_html is not None else "html.parser"
+    return _cards_from_soup(BeautifulSoup(html, parser, parse_only=_CARD_STRAINER), product_id, source)
+
+
+# ---------- LXML BACKEND ----------
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_XP_CARDS = f"//li[{_has_class('fdbk-container')}]"
+_XP_REVIEWER = f"(.//*[{_has_class('fdbk-container__details__info__username')}]//span)[1]"
+_XP_TEXT = f"(.//*[{_has_class('fdbk-container__details__comment')}]//span)[1]"
+_XP_DATE = f"(.//*[{_has_class('fdbk-container__details__info__divide__time')}]//span)[1]"
+
+
+def _first_text(node, xpath):
+    found = node.xpath(xpath)
+    return found[0].text_content().strip() if found else None
+
+
+def _cards_lxml(html, product_id, source):
+    if not html or not html.strip():
+        return []
+    root = lxml_html.fromstring(html)
+    reviews = []
+    for card in root.xpath(_XP_CARDS):
+        text = _first_text(card, _XP_TEXT)
+        if text:
+            reviews.append(_review(
+                product_id, source, _first_text(card, _XP_REVIEWER), text, _first_text(card, _XP_DATE)
+            ))
+    return reviews
+
+
+CARD_EXTRACTORS = {
+    "full": _cards_full,
+    "strainer": _cards_strainer,
+}
+if lxml_html is not None:
+    CARD_EXTRACTORS["lxml"] = _cards_lxml
+
+
+def _resolve(backend):
+    backend = backend or EBAY_CARD_EXTRACTOR
+    if backend == "auto":
+        backend = "lxml" if "lxml" in CARD_EXTRACTORS else "strainer"
+    if backend not in CARD_EXTRACTORS:
+        raise ValueError(f"Unknown card extractor '{backend}'. Choose from: {', '.join(CARD_EXTRACTORS)}")
+    return backend
+
+
+# ---------- PUBLIC API ----------
+def extract_cards(html: str, product_id: str, source: str, backend: str = None):
+    """Extract feedback cards from raw page HTML as review dicts."""
+    return CARD_EXTRACTORS[_resolve(backend)](html or "", product_id, source)
+
+
+def extract_seller_name(html: str, backend: str = None):
+    """Seller username from the first /usr/ link on an item page."""
+    if not html:
+        return None
+    if _resolve(backend) == "lxml":
+        hrefs = lxml_html.fromstring(html).xpath("//a[contains(@href, '/usr/')]/@href") if html.strip() else []
+        href = hrefs[0] if hrefs else None
+    else:
+        soup = BeautifulSoup(html, "html.parser", parse_only=_SELLER_STRAINER)
+        link = soup.find("a")
+        href = link["href"] if link else None
+    return href.split("/usr/")[-1] if href else None
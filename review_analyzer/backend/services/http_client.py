@@ -0,0 +1,157 @@
+import os
+import time
+import random
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# -----------------------------------
+# 1️⃣ Config
+# -----------------------------------
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_CAP = float(os.getenv("HTTP_BACKOFF_CAP", "30"))
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Total seconds one logical request may spend on a host, across all retries
+DEFAULT_HOST_BUDGETS = {
+    "api.scraperapi.com": 180.0,
+    "api.bestbuy.com": 60.0,
+}
+
+
+def _parse_budgets(raw: str) -> dict:
+    """HTTP_TIMEOUT_BUDGETS="api.bestbuy.com=45,api.scraperapi.com=240" """
+    budgets = {}
+    for item in (raw or "").split(","):
+        host, _, secs = item.partition("=")
+        if host.strip() and secs.strip():
+            budgets[host.strip()] = float(secs)
+    return budgets
+
+
+# -----------------------------------
+# 2️⃣ Pooled Client
+# -----------------------------------
+class HttpClient:
+    """Keep-alive Session per host with retries, time budgets and counters."""
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, host_budgets: dict = None,
+                 backoff_base: float = HTTP_BACKOFF_BASE, backoff_cap: float = HTTP_BACKOFF_CAP):
+        self.pool_size = pool_size
+        self.host_budgets = dict(DEFAULT_HOST_BUDGETS)
+        self.host_budgets.update(host_budgets or {})
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._sessions = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def session(self, host: str) -> requests.Session:
+        with self._lock:
+            s = self._sessions.get(host)
+            if s is None:
+                s = requests.Session()
+                # Retries are handled in get() so they can be counted and budgeted
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                self._sessions[host] = s
+            return s
+
+    def backoff_delay(self, attempt: int, resp=None) -> float:
+        """Jittered exponential backoff; a numeric Retry-After header wins."""
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return min(self.backoff_cap, self.backoff_base * 2 ** attempt) * (0.5 + random.random())
+
+    def get(self, url: str, params=None, timeout: float = HTTP_TIMEOUT, retries: int = 3,
+            retry_statuses=RETRY_STATUSES, before_attempt=None, wait=None):
+        """GET with retries on connection errors and ``retry_statuses``.
+
+        Returns the last response (callers check the status) or raises the
+        last RequestException if no attempt got a response. ``before_attempt``
+        runs before each try (e.g. a rate limiter) and ``wait(seconds)``
+        replaces time.sleep between tries.
+        """
+        host = urlparse(url).hostname or ""
+        session = self.session(host)
+        deadline = time.monotonic() + self.host_budgets.get(host, timeout * (retries + 1))
+        last_exc = None
+        resp = None
+
+        for attempt in range(retries + 1):
+            if before_attempt:
+                before_attempt()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if attempt:
+                self._count(host, retries=1)
+
+            start = time.monotonic()
+            try:
+                resp = session.get(url, params=params, timeout=min(timeout, remaining))
+                last_exc = None
+            except requests.exceptions.RequestException as e:
+                self._count(host, requests=1, errors=1, latency=time.monotonic() - start)
+                print(f"⚠️ {host}: {e} (attempt {attempt + 1}/{retries + 1})")
+                resp, last_exc = None, e
+            else:
+                self._count(host, requests=1, latency=time.monotonic() - start,
+                            bytes=len(resp.content or b""))
+                if resp.status_code not in retry_statuses:
+                    return resp
+                print(f"⚠️ {host}: HTTP {resp.status_code} (attempt {attempt + 1}/{retries + 1})")
+
+            if attempt < retries:
+                delay = min(self.backoff_delay(attempt, resp), max(0.0, deadline - time.monotonic()))
+                (wait or time.sleep)(delay)
+
+        if resp is None and last_exc is not None:
+            raise last_exc
+        if resp is None:
+            raise requests.exceptions.Timeout(f"Timeout budget exhausted for {host}")
+        return resp
+
+    def _count(self, host, requests=0, errors=0, retries=0, bytes=0, latency=0.0):
+        with self._lock:
+            s = self._stats.setdefault(host, {
+                "requests": 0, "errors": 0, "retries": 0, "bytes": 0,
+                "latency_total_s": 0.0, "latency_max_s": 0.0,
+            })
+            s["requests"] += requests
+            s["errors"] += errors
+            s["retries"] += retries
+            s["bytes"] += bytes
+            s["latency_total_s"] += latency
+            s["latency_max_s"] = max(s["latency_max_s"], latency)
+
+    def stats(self) -> dict:
+        """Per-host counters: requests, errors, retries, bytes, latency (total/avg/max)."""
+        with self._lock:
+            out = {}
+            for host, s in self._stats.items():
+                s = dict(s)
+                s["latency_avg_s"] = round(s["latency_total_s"] / s["requests"], 4) if s["requests"] else 0.0
+                out[host] = s
+            return out
+
+
+# -----------------------------------
+# 3️⃣ Shared Instance
+# -----------------------------------
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(host_budgets=_parse_budgets(os.getenv("HTTP_TIMEOUT_BUDGETS", "")))
+        return _client
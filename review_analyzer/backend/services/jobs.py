@@ -0,0 +1,199 @@
+import os
+import uuid
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from pymongo import ReturnDocument, errors
+
+# =====================================================
+# 🧵 Job Queue (job documents in Mongo)
+# =====================================================
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# Finished jobs are deleted by a TTL index this long after they finish
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "86400"))
+# An active job whose lease wasn't renewed for this long is assumed lost (its
+# worker died) and can be replaced
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "3600"))
+# How often a worker renews the lease of the jobs it holds (queued or running)
+JOB_HEARTBEAT = int(os.getenv("JOB_HEARTBEAT", "60"))
+
+# Internal fields not returned to clients
+_PRIVATE = ("_id", "active", "leased_at", "expires_at", "result")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobQueue:
+    """Runs registered long tasks (scrape / NLP / summary) on a worker pool.
+
+    Job documents live in Mongo (``get_collection``, normally
+    repository.jobs) keyed by job id, so a status poll can land on any
+    gunicorn worker; the task itself runs on the pool of the worker that
+    accepted it. Jobs are coalesced by (kind, key) through a unique index
+    over active jobs: while a job for the same kind + product is queued or
+    running in any worker, re-submitting returns that job instead of
+    starting another. The accepting worker renews ``leased_at`` on its jobs
+    every JOB_HEARTBEAT seconds, so only a job whose worker is gone goes
+    stale. Finished jobs expire after JOB_RESULT_TTL seconds.
+
+    Handlers should return small results (counts, ids); the result is
+    stored in the job document.
+    """
+
+    def __init__(self, get_collection, workers: int = 2, stale_after: int = JOB_STALE_AFTER,
+                 result_ttl: int = JOB_RESULT_TTL):
+        self._get_collection = get_collection
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job")
+        self._handlers = {}
+        self.stale_after = stale_after
+        self.result_ttl = result_ttl
+        self.heartbeat = max(1, min(JOB_HEARTBEAT, stale_after // 3))
+        self._held = set()
+        self._held_lock = threading.Lock()
+        self._heartbeat_thread = None
+
+    @property
+    def collection(self):
+        return self._get_collection()
+
+    def register(self, kind: str, fn):
+        self._handlers[kind] = fn
+
+    @property
+    def kinds(self):
+        return list(self._handlers)
+
+    def submit(self, kind: str, key: str, **kwargs) -> dict:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'. Choose from: {', '.join(self._handlers)}")
+        col = self.collection
+        # A few rounds: the active job may finish, or be found stale, between our reads
+        for _ in range(3):
+            job = {
+                "_id": uuid.uuid4().hex,
+                "kind": kind,
+                "key": key,
+                "status": QUEUED,
+                "active": True,
+                "coalesced": 0,
+                "submitted_at": _now(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+                "result": None,
+                "leased_at": datetime.now(timezone.utc),
+            }
+            try:
+                col.insert_one(job)
+            except errors.DuplicateKeyError:
+                active = col.find_one_and_update(
+                    {"kind": kind, "key": key, "active": True},
+                    {"$inc": {"coalesced": 1}},
+                    return_document=ReturnDocument.AFTER,
+                )
+                if active is None:
+                    continue
+                if not self._is_stale(active):
+                    return self._public(active)
+                # Only if nobody renewed the lease since we read it
+                self._finish(active["_id"], FAILED, None, "Job lost (worker stopped before it finished)",
+                             leased_at=active["leased_at"])
+                continue
+            self._hold(job["_id"])
+            self._pool.submit(self._run, job["_id"], kind, key, kwargs)
+            return self._public(job)
+        raise RuntimeError(f"Could not submit {kind} job for {key}; try again")
+
+    def get(self, job_id: str, with_result: bool = False):
+        job = self.collection.find_one({"_id": job_id})
+        if job is None:
+            return None
+        return self._public(job, with_result)
+
+    def _run(self, job_id, kind, key, kwargs):
+        try:
+            started = self.collection.update_one(
+                {"_id": job_id, "active": True},
+                {"$set": {"status": RUNNING, "started_at": _now(), "leased_at": datetime.now(timezone.utc)}},
+            )
+            if not started.matched_count:
+                print(f"⚠️ Job {kind}:{key} was replaced before it started; skipping")
+                return
+            try:
+                result = self._handlers[kind](**kwargs)
+                status, error = DONE, None
+            except Exception as e:
+                traceback.print_exc()
+                result, status, error = None, FAILED, str(e)
+            if not self._finish(job_id, status, result, error):
+                print(f"⚠️ Job {kind}:{key} was already failed as stale; {status} result dropped")
+                return
+            print(f"🧵 Job {kind}:{key} {status}")
+        finally:
+            self._release(job_id)
+
+    # ---------- Lease heartbeat ----------
+    def _hold(self, job_id):
+        with self._held_lock:
+            self._held.add(job_id)
+            if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+                self._heartbeat_thread = threading.Thread(
+                    target=self._renew_leases, name="job-heartbeat", daemon=True
+                )
+                self._heartbeat_thread.start()
+
+    def _release(self, job_id):
+        with self._held_lock:
+            self._held.discard(job_id)
+
+    def _renew_leases(self):
+        """Renew leased_at on every job this process holds; exits once it holds none."""
+        while True:
+            time.sleep(self.heartbeat)
+            with self._held_lock:
+                held = list(self._held)
+                if not held:
+                    self._heartbeat_thread = None
+                    return
+            try:
+                self.collection.update_many(
+                    {"_id": {"$in": held}, "active": True},
+                    {"$set": {"leased_at": datetime.now(timezone.utc)}},
+                )
+            except errors.PyMongoError as e:
+                print(f"⚠️ Job lease renewal failed: {e}")
+
+    def _finish(self, job_id, status, result, error, leased_at=None):
+        """Close an active job; returns False if it was no longer active (or re-leased)."""
+        query = {"_id": job_id, "active": True}
+        if leased_at is not None:
+            query["leased_at"] = leased_at
+        return self.collection.update_one(query, {"$set": {
+            "status": status,
+            "result": result,
+            "error": error,
+            "active": False,
+            "finished_at": _now(),
+            "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.result_ttl),
+        }}).matched_count > 0
+
+    def _is_stale(self, job):
+        leased_at = job.get("leased_at")
+        if leased_at is None:
+            return False
+        if leased_at.tzinfo is None:
+            # pymongo returns naive UTC datetimes unless tz_aware=True
+            leased_at = leased_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - leased_at > timedelta(seconds=self.stale_after)
+
+    @staticmethod
+    def _public(job, with_result=False):
+        out = {"job_id": job["_id"], **{k: v for k, v in job.items() if k not in _PRIVATE}}
+        if with_result:
+            out["result"] = job.get("result")
+        return out
@@ -0,0 +1,94 @@
+import os
+import json
+import gzip
+from datetime import date, datetime
+from bson import ObjectId
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback, same output shape
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # br is optional; gzip is always available
+    brotli = None
+
+# =====================================================
+# ⚡ Fast JSON responses (orjson + optional compression)
+# =====================================================
+# Mongo docs are serialized as-is: ObjectId → str and datetime → ISO 8601
+# happen inside the encoder, so routes no longer copy every document first.
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "auto")  # auto | gzip | off
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "4096"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(o):
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, (set, frozenset, tuple)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """UTF-8 JSON bytes for ``obj`` (Mongo docs included)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(s):
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider so jsonify() and request.get_json() use orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype="application/json")
+
+
+def compress_response(response, accept_encodings):
+    """after_request hook body: gzip/brotli large JSON responses.
+
+    Streams (NDJSON), errors and small bodies are passed through untouched.
+    """
+    if (
+        RESPONSE_COMPRESSION == "off"
+        or response.is_streamed
+        or response.direct_passthrough
+        or response.mimetype != "application/json"
+        or not 200 <= response.status_code < 300
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+
+    if brotli is not None and RESPONSE_COMPRESSION == "auto" and "br" in accept_encodings:
+        data, encoding = brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    elif "gzip" in accept_encodings:
+        data, encoding = gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    else:
+        return response
+
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
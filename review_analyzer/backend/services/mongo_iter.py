@@ -0,0 +1,64 @@
+import os
+from itertools import islice
+from services.json_codec import dumps
+
+# =====================================================
+# 🔁 Streaming Mongo iteration helpers
+# =====================================================
+# Callers iterate cursors instead of list(collection.find(...)), so peak
+# memory is one cursor batch rather than every matching document.
+MONGO_BATCH_SIZE = int(os.getenv("MONGO_BATCH_SIZE", "500"))
+
+
+def iter_docs(collection, query, projection=None, batch_size: int = None, sort=None, limit: int = 0):
+    """Yield matching docs; the driver fetches ``batch_size`` per round trip."""
+    cursor = collection.find(query, projection).batch_size(batch_size or MONGO_BATCH_SIZE)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def iter_batches(collection, query, projection=None, batch_size: int = None, sort=None):
+    """Yield lists of up to ``batch_size`` docs (for bulk writes / batch NLP)."""
+    batch_size = batch_size or MONGO_BATCH_SIZE
+    docs = iter_docs(collection, query, projection, batch_size, sort)
+    while True:
+        chunk = list(islice(docs, batch_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_field(collection, query, field: str, batch_size: int = None):
+    """Yield one field's values, projecting everything else away."""
+    for d in iter_docs(collection, query, {field: 1, "_id": 0}, batch_size):
+        if field in d:
+            yield d[field]
+
+
+def ndjson(docs):
+    """Encode docs as newline-delimited JSON lines (ObjectId → str)."""
+    for d in docs:
+        yield dumps(d) + b"\n"
+
+
+def keyset_page(collection, query, limit: int, after=None, projection=None):
+    """One page of docs ordered by _id, starting after the ``after`` _id.
+
+    Uses an indexed range scan instead of skip(), so every page costs the
+    same. Returns (docs, next_after); next_after is None on the last page.
+    """
+    if after is not None:
+        query = {"$and": [query, {"_id": {"$gt": after}}]}
+    if projection is not None:
+        projection = {**projection, "_id": 1}  # the cursor needs _id
+    docs = list(collection.find(query, projection).sort("_id", 1).limit(limit + 1))
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, docs[-1]["_id"]
+    return docs, None
@@ -0,0 +1,100 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+
+# =====================================================
+# 📈 Materialized per-product stats (product_stats)
+# =====================================================
+SENTIMENTS = ("Positive", "Neutral", "Negative")
+ASPECT_EXAMPLES_K = 3
+TOP_K = 5
+
+
+def stats_update(docs):
+    """Mongo update that folds processed review ``docs`` into a product_stats doc.
+
+    Counters use $inc and example lists use $push/$each/$sort/$slice, so
+    applying batches in any order gives the same document and the write is
+    atomic per product. Each processed review must be applied exactly once
+    (callers pass only newly inserted docs, which must have their ``_id``).
+    List items keep the review ``_id`` as the tie-break, like the rebuild.
+    """
+    inc = defaultdict(int)
+    pushes = defaultdict(list)
+    for d in docs:
+        inc["total_reviews"] += 1
+        sentiment = d.get("sentiment")
+        if sentiment:
+            inc[f"sentiments.{sentiment}"] += 1
+        s = sentiment or "Neutral"  # aspect buckets default to Neutral
+        aspects = d.get("aspects") or []
+        for aspect in aspects:
+            inc[f"aspects.{aspect}.{s}"] += 1
+
+        text = (d.get("text") or "").strip()
+        conf = float(d.get("confidence") or 0.0)
+        if text:
+            for aspect in aspects:
+                pushes[f"aspect_examples.{aspect}.{s}"].append({"_id": d["_id"], "text": text, "confidence": conf})
+        if sentiment in ("Positive", "Negative"):
+            pushes[f"top_{sentiment.lower()}"].append(
+                {"_id": d["_id"], "text": d.get("text"), "confidence": d.get("confidence") or 0}
+            )
+
+    update = {"$set": {"updated_at": datetime.now(timezone.utc).isoformat()}}
+    if inc:
+        update["$inc"] = dict(inc)
+    if pushes:
+        update["$push"] = {
+            field: {
+                "$each": items,
+                # _id breaks ties the same way the rebuild pipeline does
+                "$sort": {"confidence": -1, "_id": 1},
+                "$slice": TOP_K if field.startswith("top_") else ASPECT_EXAMPLES_K,
+            }
+            for field, items in pushes.items()
+        }
+    return update
+
+
+def apply_reviews(collection, product_id: str, docs):
+    """Increment a product's stats with newly processed reviews."""
+    docs = list(docs)
+    if docs:
+        collection.update_one({"product_id": product_id}, stats_update(docs), upsert=True)
+
+
+def overall_score(sentiments: dict, total: int) -> float:
+    """Positive% − Negative%, same formula as the compare summary."""
+    if not total:
+        return 0
+    pct = lambda x: round(100 * x / total, 2)
+    return round(pct(sentiments.get("Positive", 0)) - pct(sentiments.get("Negative", 0)), 2)
+
+
+def _examples(items):
+    return [{"text": x.get("text"), "confidence": x.get("confidence")} for x in items]
+
+
+def to_response(product_id: str, doc):
+    """Shape a product_stats doc like the /api/process payload."""
+    doc = doc or {}
+    total = doc.get("total_reviews", 0)
+    sentiments = doc.get("sentiments", {})
+    aspects = {
+        a: {s: counts.get(s, 0) for s in ("Positive", "Negative", "Neutral")}
+        for a, counts in (doc.get("aspects") or {}).items()
+    }
+    examples = {
+        a: {s: _examples(buckets.get(s, [])) for s in SENTIMENTS}
+        for a, buckets in (doc.get("aspect_examples") or {}).items()
+    }
+    return {
+        "product_id": product_id,
+        "total_reviews": total,
+        "sentiments": sentiments,
+        "aspects": aspects,
+        "aspect_examples": examples,
+        "top_positive": _examples(doc.get("top_positive", [])),
+        "top_negative": _examples(doc.get("top_negative", [])),
+        "overall_score": overall_score(sentiments, total),
+    }
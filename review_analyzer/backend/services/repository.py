@@ -0,0 +1,265 @@
+import os
+import hashlib
+import threading
+from datetime import datetime, timezone
+from pymongo import UpdateOne, errors
+from services import db
+
+# =====================================================
+# 📚 Review repository — collections and their indexes
+# =====================================================
+# Every service reaches Mongo through these accessors, and every index
+# lives in INDEXES below; ensure_indexes() creates them once per process
+# (at startup, or on first write if nothing called it earlier).
+
+
+# ---------- Collections ----------
+def raw_reviews():
+    return db.raw_db()["reviews_raw"]
+
+
+def product_titles():
+    return db.raw_db()["product_titles"]
+
+
+def processed_reviews():
+    return db.processed_db()["reviews"]
+
+
+def review_summaries():
+    return db.processed_db()["review_summaries"]
+
+
+def product_stats():
+    return db.processed_db()["product_stats"]
+
+
+def processing_state():
+    # Per-product high-water mark: last raw _id already analyzed
+    return db.processed_db()["processing_state"]
+
+
+def locks():
+    return db.processed_db()["locks"]
+
+
+def reprocess_checkpoints():
+    return db.processed_db()["reprocess_checkpoints"]
+
+
+def jobs():
+    # Background job documents (services.jobs), shared by every worker
+    return db.processed_db()["jobs"]
+
+
+def migrations():
+    # One marker doc per finished one-off migration
+    return db.processed_db()["migrations"]
+
+
+# ---------- Dedup key ----------
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def text_hash(text: str) -> str:
+    """Stable hash of the normalized review text, used as the dedup key."""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+# ---------- Indexes ----------
+# (collection accessor, keys, options)
+INDEXES = [
+    (raw_reviews, [("product_id", 1)], {"name": "product_id_index"}),
+    # Delta reads and keyset pages: {product_id, _id > mark} sorted by _id
+    (raw_reviews, [("product_id", 1), ("_id", 1)], {"name": "product_id_raw_id"}),
+    # Cached-SKU lookups and streamed BestBuy reads
+    (raw_reviews, [("sku", 1), ("_id", 1)], {"name": "sku_id_index"}),
+    # BestBuy review IDs are unique per product (eBay docs have no `id`)
+    (raw_reviews, [("product_id", 1), ("id", 1)], {
+        "name": "product_review_id_unique",
+        "unique": True,
+        "partialFilterExpression": {"id": {"$exists": True}},
+    }),
+    (product_titles, [("product_id", 1)], {"name": "product_id_index"}),
+    (processed_reviews, [("product_id", 1), ("text_hash", 1)], {
+        "name": "product_text_hash_unique",
+        "unique": True,
+        "partialFilterExpression": {"text_hash": {"$exists": True}},
+    }),
+    (review_summaries, [("product_id", 1)], {"name": "product_id_index"}),
+    (product_stats, [("product_id", 1)], {"name": "product_id_unique", "unique": True}),
+    (processing_state, [("product_id", 1)], {"name": "product_id_unique", "unique": True}),
+    # At most one queued/running job per (kind, key), across all workers
+    (jobs, [("kind", 1), ("key", 1)], {
+        "name": "active_kind_key_unique",
+        "unique": True,
+        "partialFilterExpression": {"active": True},
+    }),
+    # Finished jobs are removed once expires_at passes
+    (jobs, [("expires_at", 1)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+]
+
+# Indexes the write paths can't do without: a missing text_hash index stores
+# duplicate processed reviews, a missing active-job index runs jobs twice.
+# Any other index that fails to build only logs a warning.
+REQUIRED_INDEXES = {"product_text_hash_unique", "active_kind_key_unique"}
+
+BACKFILL_BATCH_SIZE = int(os.getenv("PROCESS_BATCH_SIZE", "1000"))
+
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+
+
+def backfill_text_hash(batch_size: int = BACKFILL_BATCH_SIZE):
+    """Set text_hash on processed docs written before it existed. Returns the count."""
+    col = processed_reviews()
+    ops = []
+    updated = 0
+    for d in col.find({"text_hash": {"$exists": False}}, {"text": 1}):
+        ops.append(UpdateOne({"_id": d["_id"]}, {"$set": {"text_hash": text_hash(d.get("text") or "")}}))
+        if len(ops) >= batch_size:
+            updated += col.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += col.bulk_write(ops, ordered=False).modified_count
+    return updated
+
+
+def dedup_processed():
+    """Delete all but the oldest processed doc per (product_id, text_hash).
+
+    Legacy rows that differed only by case or whitespace share a hash once
+    backfilled and would block the unique index. Stats docs of affected
+    products are dropped; get_product_stats rebuilds them on next read.
+    Returns the number of docs removed.
+    """
+    col = processed_reviews()
+    groups = col.aggregate([
+        {"$match": {"text_hash": {"$exists": True}}},
+        {"$group": {
+            "_id": {"product_id": "$product_id", "text_hash": "$text_hash"},
+            "ids": {"$push": "$_id"},
+            "n": {"$sum": 1},
+        }},
+        {"$match": {"n": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    removed = 0
+    products = set()
+    for g in groups:
+        extra = sorted(g["ids"])[1:]
+        removed += col.delete_many({"_id": {"$in": extra}}).deleted_count
+        products.add(g["_id"].get("product_id"))
+    if products:
+        product_stats().delete_many({"product_id": {"$in": list(products)}})
+    return removed
+
+
+TEXT_HASH_MIGRATION = "processed_text_hash_v1"
+
+
+def migrate_text_hash():
+    """One-off: backfill text_hash and drop the duplicates it exposes.
+
+    Guarded by a marker doc in ``migrations``, so it scans the processed
+    collection once per database rather than once per process. Both steps
+    are idempotent, so two processes racing on a fresh database is safe.
+    """
+    if migrations().find_one({"_id": TEXT_HASH_MIGRATION}):
+        return
+    backfilled = backfill_text_hash()
+    removed = dedup_processed()
+    migrations().update_one(
+        {"_id": TEXT_HASH_MIGRATION},
+        {"$set": {
+            "backfilled": backfilled,
+            "duplicates_removed": removed,
+            "done_at": datetime.now(timezone.utc).isoformat(),
+        }},
+        upsert=True,
+    )
+    print(f"🧹 text_hash migration: {backfilled} backfilled, {removed} duplicates removed")
+
+
+def dedup_raw_ids():
+    """Drop null review ids, then all but the oldest raw doc per (product_id, id).
+
+    Older BestBuy writes stored ``"id": None`` for reviews without one, and
+    ``$exists`` matches nulls, so those rows (and any re-scraped duplicates)
+    would block product_review_id_unique. Returns (ids unset, docs removed).
+    """
+    col = raw_reviews()
+    unset = col.update_many({"id": None}, {"$unset": {"id": ""}}).modified_count
+    groups = col.aggregate([
+        {"$match": {"id": {"$exists": True}}},
+        {"$group": {
+            "_id": {"product_id": "$product_id", "id": "$id"},
+            "ids": {"$push": "$_id"},
+            "n": {"$sum": 1},
+        }},
+        {"$match": {"n": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    removed = 0
+    for g in groups:
+        extra = sorted(g["ids"])[1:]
+        removed += col.delete_many({"_id": {"$in": extra}}).deleted_count
+    return unset, removed
+
+
+RAW_ID_MIGRATION = "raw_review_id_v1"
+
+
+def migrate_raw_ids():
+    """One-off: clean up raw review ids before product_review_id_unique is built.
+
+    Same marker-doc guard as migrate_text_hash. Removed raw docs were exact
+    re-scrapes of a kept one, so processed reviews and stats are unaffected.
+    """
+    if migrations().find_one({"_id": RAW_ID_MIGRATION}):
+        return
+    unset, removed = dedup_raw_ids()
+    migrations().update_one(
+        {"_id": RAW_ID_MIGRATION},
+        {"$set": {
+            "null_ids_unset": unset,
+            "duplicates_removed": removed,
+            "done_at": datetime.now(timezone.utc).isoformat(),
+        }},
+        upsert=True,
+    )
+    print(f"🧹 raw id migration: {unset} null ids unset, {removed} duplicates removed")
+
+
+def ensure_indexes():
+    """Run the migrations, then create every index in INDEXES (once per process).
+
+    An index in REQUIRED_INDEXES that can't be built raises: the writes rely
+    on it to reject duplicates, so continuing without it would store them
+    silently. Any other failure is logged and startup carries on.
+    """
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    with _indexes_lock:
+        if _indexes_ready:
+            return
+        # Migrate first: the unique indexes only cover docs that have the key
+        migrate_text_hash()
+        migrate_raw_ids()
+        for collection, keys, options in INDEXES:
+            try:
+                collection().create_index(keys, **options)
+            except errors.OperationFailure as e:
+                if options["name"] in REQUIRED_INDEXES:
+                    raise RuntimeError(
+                        f"Unique index {options['name']} on {collection().name} could not be built "
+                        f"(duplicate keys?); refusing to write without it: {e}"
+                    ) from e
+                print(f"⚠️ Could not create index {options['name']} on {collection().name}: {e}")
+        _indexes_ready = True
+
+
+if __name__ == "__main__":
+    # python -m services.repository — run migrations and build indexes (e.g. at deploy)
+    ensure_indexes()
+    print("✅ Indexes ready")
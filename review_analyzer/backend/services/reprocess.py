@@ -0,0 +1,207 @@
+"""Re-run NLP over the whole reviews_raw collection on every core.
+
+Use after changing ASPECT_KEYWORDS or the sentiment thresholds:
+
+    python -m services.reprocess --workers 8
+    python -m services.reprocess --shard-by id --shards 64 --run-id aspects-v2
+    python -m services.reprocess --run-id aspects-v2        # resume
+
+Raw reviews are streamed with a server-side cursor and split into shards
+(one per product_id, or _id ranges for very large products). Shards run on
+a process pool; each one re-analyzes its reviews in batches and upserts the
+results by (product_id, text_hash), so existing processed docs are updated
+in place. The shard plan and finished shards are checkpointed under
+--run-id; re-running with the same id reuses that plan, skips finished
+shards and completes any stats rebuild that was interrupted.
+"""
+import os
+import sys
+import time
+import argparse
+from multiprocessing import Pool
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from services import nlp_utils as nlp
+from services import repository
+from services.mongo_iter import iter_batches
+
+
+# -----------------------------------
+# 1️⃣ Shards
+# -----------------------------------
+def product_shards(products=None):
+    ids = products or nlp.raw_collection().distinct("product_id")
+    return [{"key": f"product:{pid}", "product_id": pid} for pid in ids]
+
+
+def id_range_shards(n: int):
+    """Split reviews_raw into ~n contiguous _id ranges."""
+    rows = list(nlp.raw_collection().aggregate([
+        {"$project": {"_id": 1}},
+        {"$bucketAuto": {"groupBy": "$_id", "buckets": n}},
+    ], allowDiskUse=True))
+    return [
+        # bucketAuto ranges are [min, max) except the last one, which includes max
+        {"key": f"id:{r['_id']['min']}-{r['_id']['max']}", "product_id": None,
+         "lo": r["_id"]["min"], "hi": r["_id"]["max"], "last": i == len(rows) - 1}
+        for i, r in enumerate(rows)
+    ]
+
+
+def shard_query(shard):
+    if shard["product_id"] is not None:
+        return {"product_id": shard["product_id"]}
+    upper = {"$lte": shard["hi"]} if shard["last"] else {"$lt": shard["hi"]}
+    return {"_id": {"$gte": shard["lo"], **upper}}
+
+
+# -----------------------------------
+# 2️⃣ Shard runner (in worker)
+# -----------------------------------
+def reprocess_shard(shard, batch_size: int = nlp.PROCESS_BATCH_SIZE):
+    """Re-analyze one shard; returns (shard key, reviews written, products touched, seconds)."""
+    start = time.monotonic()
+    written = 0
+    touched = {}
+    for chunk in iter_batches(nlp.raw_collection(), shard_query(shard), nlp._RAW_FIELDS,
+                              batch_size, sort=[("_id", 1)]):
+        rows = [(r, (r.get("text") or "").strip()) for r in chunk]
+        rows = [(r, text) for r, text in rows if text]
+        for r in chunk:
+            pid = r.get("product_id")
+            touched[pid] = max(touched.get(pid, r["_id"]), r["_id"])
+        if not rows:
+            continue
+
+        matcher = nlp.get_aspect_matcher()
+        batch = nlp.analyze_batch([text for _, text in rows], matcher)
+        ops = []
+        for (r, text), sentiment, confidence, mask in zip(
+            rows, batch["sentiment"], batch["confidence"], batch["aspect_mask"]
+        ):
+            doc = nlp._processed_doc(r, text, sentiment, confidence, matcher.names(mask))
+            analysis = {k: doc.pop(k) for k in ("sentiment", "confidence", "aspects")}
+            ops.append(UpdateOne(
+                {"product_id": doc["product_id"], "text_hash": doc["text_hash"]},
+                {"$set": analysis, "$setOnInsert": doc},
+                upsert=True,
+            ))
+        nlp.processed_collection().bulk_write(ops, ordered=False)
+        written += len(ops)
+
+    if shard["product_id"] is not None:
+        _finish_products(touched)
+    return shard["key"], written, list(touched.items()), time.monotonic() - start
+
+
+def _finish_products(touched: dict):
+    """Refresh derived state for products whose reviews were rewritten."""
+    for pid, last_id in touched.items():
+        nlp.rebuild_product_stats(pid)
+        nlp.state_collection().update_one(
+            {"product_id": pid}, {"$max": {"last_raw_id": last_id}}, upsert=True
+        )
+
+
+# -----------------------------------
+# 3️⃣ Driver
+# -----------------------------------
+# The checkpoint doc (reprocess_checkpoints, _id = run id) holds everything
+# a resume needs: the shard plan as first computed, the finished shards,
+# the products each finished _id-range shard touched, and which of those
+# have had their stats rebuilt. A resumed run never re-plans, so shard
+# boundaries stay fixed even if reviews_raw changed in between.
+def _load_plan(checkpoints, run_id, shard_by, shards, products, workers):
+    checkpoint = checkpoints.find_one({"_id": run_id})
+    if checkpoint and checkpoint.get("plan") is not None:
+        if checkpoint.get("shard_by") != shard_by:
+            print(f"⚠️ Run {run_id} was planned with --shard-by {checkpoint.get('shard_by')}; resuming that plan")
+        return checkpoint
+
+    plan = id_range_shards(shards or workers * 4) if shard_by == "id" else product_shards(products)
+    checkpoints.update_one(
+        {"_id": run_id},
+        {"$setOnInsert": {"started_at": datetime.now(timezone.utc).isoformat()},
+         "$set": {"shard_by": shard_by, "plan": plan}},
+        upsert=True,
+    )
+    return checkpoints.find_one({"_id": run_id})
+
+
+def _finish_range_products(checkpoints, run_id):
+    """Checkpointed stats step for --shard-by id: rebuild every product any
+    finished shard touched (this run or an earlier one) that isn't done yet."""
+    checkpoint = checkpoints.find_one({"_id": run_id}) or {}
+    touched = {}
+    for t in checkpoint.get("touched", []):
+        pid, last_id = t["product_id"], t["last_raw_id"]
+        touched[pid] = max(touched.get(pid, last_id), last_id)
+    done = set(checkpoint.get("stats_done", []))
+    todo = {pid: last_id for pid, last_id in touched.items() if pid not in done}
+    if not todo:
+        return
+    # Range shards cut across products; refresh their stats once at the end
+    print(f"📈 Rebuilding stats for {len(todo)} products ({len(done)} already done)...")
+    for pid, last_id in todo.items():
+        _finish_products({pid: last_id})
+        checkpoints.update_one({"_id": run_id}, {"$addToSet": {"stats_done": pid}})
+
+
+def run(run_id: str, workers: int = os.cpu_count() or 1, shard_by: str = "product",
+        shards: int = 0, products=None, batch_size: int = nlp.PROCESS_BATCH_SIZE):
+    repository.ensure_indexes()
+    checkpoints = repository.reprocess_checkpoints()
+    checkpoint = _load_plan(checkpoints, run_id, shard_by, shards, products, workers)
+    plan, shard_by = checkpoint["plan"], checkpoint["shard_by"]
+    done = set(checkpoint.get("done_shards", []))
+    todo = [s for s in plan if s["key"] not in done]
+    print(f"🧭 Run {run_id}: {len(plan)} shards ({len(done)} already done), {workers} workers")
+
+    start = time.monotonic()
+    total = 0
+    # Workers build their own MongoClient after fork (services.db)
+    with Pool(processes=workers) as pool:
+        results = pool.imap_unordered(_run_shard, [(s, batch_size) for s in todo])
+        for i, (key, written, shard_touched, secs) in enumerate(results, 1):
+            total += written
+            update = {"$addToSet": {"done_shards": key}}
+            if shard_by == "id" and shard_touched:
+                # Recorded with the shard so a resume can still rebuild these products
+                update["$push"] = {"touched": {"$each": [
+                    {"product_id": pid, "last_raw_id": last_id} for pid, last_id in shard_touched
+                ]}}
+            checkpoints.update_one({"_id": run_id}, update)
+            rate = total / max(time.monotonic() - start, 1e-9)
+            print(f"📦 [{i}/{len(todo)}] {key}: {written} reviews in {secs:.1f}s | total {total} | {rate:,.0f} reviews/s")
+
+    if shard_by == "id":
+        _finish_range_products(checkpoints, run_id)
+
+    elapsed = time.monotonic() - start
+    checkpoints.update_one({"_id": run_id}, {"$set": {"finished_at": datetime.now(timezone.utc).isoformat()}})
+    print(f"✅ Reprocessed {total} reviews in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} reviews/s)")
+    return total
+
+
+def _run_shard(args):
+    shard, batch_size = args
+    return reprocess_shard(shard, batch_size)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Re-run NLP over reviews_raw on a process pool.")
+    ap.add_argument("--run-id", default=datetime.now(timezone.utc).strftime("reprocess-%Y%m%d-%H%M%S"),
+                    help="checkpoint id; reuse it to resume an interrupted run")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--shard-by", choices=("product", "id"), default="product")
+    ap.add_argument("--shards", type=int, default=0, help="number of _id ranges for --shard-by id")
+    ap.add_argument("--product", action="append", dest="products", help="limit to these product ids")
+    ap.add_argument("--batch-size", type=int, default=nlp.PROCESS_BATCH_SIZE)
+    args = ap.parse_args(argv)
+    run(args.run_id, args.workers, args.shard_by, args.shards, args.products, args.batch_size)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Append-only, compressed NDJSON archive of scraped reviews.
+
+One file per source + product (``data/archive/ebay_reviews_<id>.ndjson.gz``).
+Every scrape appends a new gzip member (or zstd frame) holding one review
+per line, stamped with ``scraped_at``; readers decode the concatenated
+members as a single stream, so files never need rewriting.
+
+    python -m services.review_archive convert [--delete]   # legacy data/*.json → archive
+    python -m services.review_archive replay [paths...]    # re-ingest into reviews_raw
+    python -m services.review_archive stats
+"""
+import os
+import sys
+import glob
+import gzip
+import json
+import mmap
+import argparse
+from datetime import datetime, timezone
+from itertools import islice
+
+from services.json_codec import dumps, loads
+from services.mongo_iter import iter_field
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+SAVE_DIR = "data"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(SAVE_DIR, "archive"))
+# auto → zstd when installed, else gzip
+ARCHIVE_CODEC = os.getenv("ARCHIVE_CODEC", "auto")
+REPLAY_BATCH_SIZE = int(os.getenv("REPLAY_BATCH_SIZE", "1000"))
+
+_EXTENSIONS = {"gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+
+
+def _codec() -> str:
+    if ARCHIVE_CODEC == "zstd" or (ARCHIVE_CODEC == "auto" and zstandard is not None):
+        if zstandard is None:
+            raise RuntimeError("ARCHIVE_CODEC=zstd but the zstandard package is not installed")
+        return "zstd"
+    return "gzip"
+
+
+def archive_path(source: str, product_id: str, codec: str = None) -> str:
+    return os.path.join(ARCHIVE_DIR, f"{source}_reviews_{product_id}{_EXTENSIONS[codec or _codec()]}")
+
+
+def _find_existing(source: str, product_id: str):
+    # Keep appending to whichever codec the product was first archived with
+    for codec in _EXTENSIONS:
+        path = archive_path(source, product_id, codec)
+        if os.path.exists(path):
+            return path, codec
+    return None, None
+
+
+# -----------------------------------
+# ✍️ Writer
+# -----------------------------------
+def append_reviews(source: str, product_id: str, reviews: list) -> str:
+    """Append one scrape of ``reviews`` to the product's archive; returns the path."""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    path, codec = _find_existing(source, product_id)
+    if path is None:
+        codec = _codec()
+        path = archive_path(source, product_id, codec)
+
+    scraped_at = datetime.now(timezone.utc).isoformat()
+    payload = b"".join(
+        dumps({k: v for k, v in {**r, "scraped_at": scraped_at}.items() if k != "_id"}) + b"\n"
+        for r in reviews
+    )
+    # gzip members / zstd frames concatenate into one valid stream
+    if codec == "zstd":
+        data = zstandard.ZstdCompressor(level=10).compress(payload)
+    else:
+        data = gzip.compress(payload, compresslevel=9)
+    with open(path, "ab") as f:
+        f.write(data)
+    return path
+
+
+# -----------------------------------
+# 📖 Readers
+# -----------------------------------
+def iter_archive(path: str, use_mmap: bool = False):
+    """Yield archived reviews one at a time.
+
+    ``use_mmap`` decompresses straight from a read-only memory map instead
+    of buffered file reads (useful when replaying many large archives).
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap else f
+        try:
+            if path.endswith(_EXTENSIONS["zstd"]):
+                if zstandard is None:
+                    raise RuntimeError(f"zstandard is required to read {path}")
+                stream = zstandard.ZstdDecompressor().stream_reader(source, read_across_frames=True)
+                lines = _lines(stream)
+            else:
+                stream = gzip.GzipFile(fileobj=source, mode="rb")
+                lines = stream
+            with stream:
+                for line in lines:
+                    if line.strip():
+                        yield loads(line)
+        finally:
+            if use_mmap:
+                source.close()
+
+
+def _lines(stream, chunk_size: int = 1 << 16):
+    # zstd stream readers don't iterate by line
+    buf = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        yield from lines
+    if buf:
+        yield buf
+
+
+def archive_files(source: str = "*", product_id: str = "*"):
+    return sorted(
+        p for ext in _EXTENSIONS.values()
+        for p in glob.glob(os.path.join(ARCHIVE_DIR, f"{source}_reviews_{product_id}{ext}"))
+    )
+
+
+# -----------------------------------
+# 🔁 Replay into Mongo
+# -----------------------------------
+def replay_into_mongo(paths, collection, batch_size: int = REPLAY_BATCH_SIZE, use_mmap: bool = True):
+    """Re-ingest archived reviews into reviews_raw, skipping ones already stored.
+
+    A review is a duplicate when its product already has the same text
+    (the rule save_reviews uses). Returns (read, inserted).
+    """
+    known = {}
+    read = inserted = 0
+    for path in paths:
+        docs = iter_archive(path, use_mmap=use_mmap)
+        while True:
+            chunk = list(islice(docs, batch_size))
+            if not chunk:
+                break
+            read += len(chunk)
+            new = []
+            for r in chunk:
+                pid = r.get("product_id")
+                if pid not in known:
+                    known[pid] = set(iter_field(collection, {"product_id": pid}, "text"))
+                if r.get("text") in known[pid]:
+                    continue
+                known[pid].add(r.get("text"))
+                r.pop("scraped_at", None)
+                new.append(r)
+            if new:
+                collection.insert_many(new, ordered=False)
+                inserted += len(new)
+        print(f"📼 Replayed {path}")
+    return read, inserted
+
+
+# -----------------------------------
+# 🧰 Legacy JSON conversion + CLI
+# -----------------------------------
+def convert_legacy(delete: bool = False):
+    """Move data/<source>_reviews_<id>.json snapshots into the archive."""
+    before = 0
+    for path in sorted(glob.glob(os.path.join(SAVE_DIR, "*_reviews_*.json"))):
+        name = os.path.basename(path)[:-len(".json")]
+        source, product_id = name.split("_reviews_", 1)
+        with open(path, encoding="utf-8") as f:
+            reviews = json.load(f)
+        out = append_reviews(source, product_id, reviews)
+        before += os.path.getsize(path)
+        if delete:
+            os.remove(path)
+        print(f"📦 {path} → {out} ({len(reviews)} reviews)")
+    after = sum(os.path.getsize(p) for p in archive_files())
+    print(f"✅ Legacy JSON {before / 1024:.1f} KB → archive {after / 1024:.1f} KB")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compressed NDJSON review archive.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="convert legacy data/*_reviews_*.json files")
+    conv.add_argument("--delete", action="store_true", help="remove the JSON files afterwards")
+    rep = sub.add_parser("replay", help="re-ingest archives into reviews_raw")
+    rep.add_argument("paths", nargs="*", help="archive files (default: all)")
+    rep.add_argument("--batch-size", type=int, default=REPLAY_BATCH_SIZE)
+    sub.add_parser("stats", help="list archives with review counts and sizes")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "convert":
+        convert_legacy(args.delete)
+    elif args.cmd == "replay":
+        from services.ebay_scraper import raw_collection
+        read, inserted = replay_into_mongo(args.paths or archive_files(), raw_collection(), args.batch_size)
+        print(f"✅ Read {read} archived reviews, inserted {inserted} new")
+    else:
+        for path in archive_files():
+            count = sum(1 for _ in iter_archive(path))
+            print(f"{path}: {count} reviews, {os.path.getsize(path) / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
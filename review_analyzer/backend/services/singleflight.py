@@ -0,0 +1,129 @@
+import time
+import uuid
+import threading
+from datetime import datetime, timedelta, timezone
+from pymongo import errors
+
+# =====================================================
+# 🛫 Single-flight (request coalescing)
+# =====================================================
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run one computation per key; concurrent callers share its result.
+
+    Within a process, callers of do() with the same key while a call is in
+    flight block on it and receive the same result (or exception).
+
+    With ``get_lease_collection`` set, the leader also takes a Mongo lease doc
+    (``_id`` = key) so that other gunicorn workers wait for it to finish
+    before running their own call — which then hits the caches the leader
+    just filled. Leases expire after ``lease_ttl`` seconds so a crashed
+    worker never blocks a key forever.
+    """
+
+    def __init__(self, get_lease_collection=None, lease_ttl: float = 600.0, poll_interval: float = 0.5):
+        self._get_lease_collection = get_lease_collection
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._indexes_ready = False
+        self.stats = {"leaders": 0, "shared": 0, "lease_waits": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["leaders"] += 1
+            else:
+                call.waiters += 1
+                self.stats["shared"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_with_lease(key, fn)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def exclusive(self, key, fn):
+        """Run ``fn`` while holding ``key``'s lease, without sharing its result.
+
+        For mutual exclusion rather than coalescing: every caller runs its
+        own ``fn``, one at a time per key across threads and workers.
+        """
+        return self._run_with_lease(key, fn)
+
+    # ---------- cross-worker lease ----------
+    @property
+    def lease_collection(self):
+        return self._get_lease_collection()
+
+    def _run_with_lease(self, key, fn):
+        if self._get_lease_collection is None:
+            return fn()
+        lease_id = ":".join(str(k) for k in key) if isinstance(key, tuple) else str(key)
+        owner = self._acquire(lease_id)
+        try:
+            return fn()
+        finally:
+            if owner:
+                self.lease_collection.delete_one({"_id": lease_id, "owner": owner})
+
+    def _ensure_indexes(self):
+        if not self._indexes_ready:
+            # Mongo's TTL monitor removes leases left behind by dead workers
+            self.lease_collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexes_ready = True
+
+    def _acquire(self, lease_id):
+        """Take the lease, waiting for another worker's lease to clear first.
+
+        Returns the owner token, or None if we gave up waiting (the call
+        then runs anyway — coalescing is best-effort, never a deadlock).
+        """
+        self._ensure_indexes()
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lease_ttl
+        waited = False
+        while time.monotonic() < deadline:
+            now = datetime.now(timezone.utc)
+            lease = {"_id": lease_id, "owner": owner, "expires_at": now + timedelta(seconds=self.lease_ttl)}
+            try:
+                self.lease_collection.insert_one(lease)
+                return owner
+            except errors.DuplicateKeyError:
+                taken = self.lease_collection.update_one(
+                    {"_id": lease_id, "expires_at": {"$lt": now}},
+                    {"$set": {"owner": owner, "expires_at": lease["expires_at"]}},
+                )
+                if taken.modified_count:
+                    return owner
+            if not waited:
+                waited = True
+                with self._lock:
+                    self.stats["lease_waits"] += 1
+                print(f"⏳ Waiting for another worker to finish {lease_id}")
+            time.sleep(self.poll_interval)
+        return None
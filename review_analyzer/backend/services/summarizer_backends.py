@@ -0,0 +1,63 @@
+import os
+
+# =====================================================
+# 🧩 Summarizer backends (selected by SUMMARIZER_BACKEND)
+# =====================================================
+# Every backend returns a transformers summarization pipeline, so callers
+# keep calling sum_model(texts, max_length=..., ...) unchanged.
+#
+#   torch       float32 PyTorch (the original behaviour)
+#   torch-int8  PyTorch with dynamic int8 quantization of Linear layers;
+#               several times faster on CPU, small quality loss
+#   onnx        ONNX Runtime via optimum; exported once to
+#               SUMMARIZER_ONNX_DIR and reused on later starts
+SUMMARIZER_ONNX_DIR = os.getenv("SUMMARIZER_ONNX_DIR", os.path.join("data", "onnx"))
+
+
+def _pipeline(model, tokenizer):
+    from transformers import pipeline
+    return pipeline("summarization", model=model, tokenizer=tokenizer, device=-1)
+
+
+def load_torch(model_name: str):
+    from transformers import pipeline
+    return pipeline("summarization", model=model_name, device=-1)
+
+
+def load_torch_int8(model_name: str):
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name).eval()
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return _pipeline(quantized, AutoTokenizer.from_pretrained(model_name))
+
+
+def load_onnx(model_name: str):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    export_dir = os.path.join(SUMMARIZER_ONNX_DIR, model_name.replace("/", "__"))
+    if os.path.isdir(export_dir):
+        model = ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        print(f"⚙️ Exporting {model_name} to ONNX → {export_dir} (first run only)...")
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return _pipeline(model, tokenizer)
+
+
+BACKENDS = {
+    "torch": load_torch,
+    "torch-int8": load_torch_int8,
+    "onnx": load_onnx,
+}
+
+
+def load_summarizer(backend: str, model_name: str):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown SUMMARIZER_BACKEND '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[backend](model_name)
@@ -0,0 +1,98 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# =====================================================
+# 🗃️ Summary Cache (in-process LRU → review_summaries)
+# =====================================================
+
+
+def review_set_fingerprint(review_keys, params: dict) -> str:
+    """Fingerprint of the exact review set + model/generation params used for a summary."""
+    h = hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8"))
+    for key in review_keys:
+        h.update(b"\0")
+        h.update(str(key).encode("utf-8"))
+    return h.hexdigest()
+
+
+class SummaryCache:
+    """Two-level cache for product summaries.
+
+    Level 1 is an in-process LRU keyed by (product_id, fingerprint); level 2
+    is the review_summaries collection (one doc per product and summary
+    mode). An entry only counts as a hit when its fingerprint matches, so a
+    changed review set or model/params always regenerates, and nothing needs
+    invalidating when reviews are processed: if the summarized window didn't
+    change (new reviews outside the sample, all duplicates) the old summary
+    is still the right one.
+
+    ``get_collection`` returns the review_summaries collection; it is
+    called per operation so no connection is needed at construction.
+    """
+
+    def __init__(self, get_collection, maxsize: int = 128):
+        self._get_collection = get_collection
+        self.maxsize = maxsize
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "mongo_hits": 0, "misses": 0}
+
+    @property
+    def collection(self):
+        return self._get_collection()
+
+    def get(self, product_id: str, fingerprint: str):
+        key = (product_id, fingerprint)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._lru[key]
+
+        doc = self.collection.find_one(
+            {"product_id": product_id, "fingerprint": fingerprint},
+            {"summary": 1},
+        )
+        with self._lock:
+            if doc and doc.get("summary"):
+                self._stats["mongo_hits"] += 1
+                self._remember(key, doc["summary"])
+                return doc["summary"]
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, product_id: str, fingerprint: str, summary: str, params: dict = None, mode: str = "abstractive"):
+        doc = {
+            "product_id": product_id,
+            "mode": mode,
+            "summary": summary,
+            "fingerprint": fingerprint,
+            "params": params or {},
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        # One doc per (product, mode); docs from before modes existed have no
+        # mode field and are taken over by the abstractive summary. Older docs
+        # may also carry a "stale" flag, which fingerprints have replaced.
+        modes = [mode, None] if mode == "abstractive" else [mode]
+        self.collection.update_one(
+            {"product_id": product_id, "mode": {"$in": modes}}, {"$set": doc, "$unset": {"stale": ""}}, upsert=True
+        )
+        with self._lock:
+            self._remember((product_id, fingerprint), summary)
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["size"] = len(self._lru)
+        lookups = s["memory_hits"] + s["mongo_hits"] + s["misses"]
+        s["hit_rate"] = round((s["memory_hits"] + s["mongo_hits"]) / lookups, 3) if lookups else 0.0
+        return s
+
+    def _remember(self, key, summary):
+        self._lru[key] = summary
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
@@ -0,0 +1,148 @@
+import string
+
+# =====================================================
+# 🎯 VADER Scorer — batch compound scores
+# =====================================================
+_PUNCTUATION = frozenset(string.punctuation)
+# Cached tokens per scorer; the vocabulary of a review corpus is small, but
+# don't let one odd batch grow the cache forever
+MAX_CACHED_TOKENS = 200_000
+
+
+class _SentiText:
+    """The two SentiText attributes sentiment_valence() reads."""
+
+    __slots__ = ("words_and_emoticons", "is_cap_diff")
+
+    def __init__(self, words, is_cap_diff):
+        self.words_and_emoticons = words
+        self.is_cap_diff = is_cap_diff
+
+
+class VaderScorer:
+    """Compound scores identical to ``sia.polarity_scores(text)["compound"]``.
+
+    polarity_scores spends most of its time outside the lexicon: SentiText
+    builds a word × punctuation dict per text just to strip punctuation,
+    then every word walks a three-word look-back of rule checks. Here:
+
+    * Token handling is a cached lookup over the whole batch. Stripping a
+      leading/trailing PUNC_LIST run from a token only depends on the token
+      itself, so each distinct raw token is normalized, lowercased and
+      looked up in the lexicon once.
+    * A text with no rule word (booster, negation, "least", "never", "so",
+      "this", "but", or all words of an idiom / multi-word booster) only
+      needs the ALL-CAPS adjustment, so its score is the plain sum of token
+      valences.
+    * Other texts run VADER's own sentiment_valence / _but_check over the
+      cached tokens, so every rule is applied exactly as nltk applies it.
+    """
+
+    def __init__(self, sia):
+        self.sia = sia
+        self.lexicon = sia.lexicon
+        constants = sia.constants
+        self.constants = constants
+        self._punc_list = frozenset(constants.PUNC_LIST)
+        self._boosters = frozenset(constants.BOOSTER_DICT)
+        self._rule_words = (
+            frozenset(w for w in constants.BOOSTER_DICT if " " not in w)
+            | frozenset(constants.NEGATE)
+            | {"least", "never", "so", "this", "but"}
+        )
+        # Multi-word entries only apply when all of their words occur
+        self._phrases = [
+            frozenset(phrase.split())
+            for phrase in list(constants.SPECIAL_CASE_IDIOMS) + list(constants.BOOSTER_DICT)
+            if " " in phrase
+        ]
+        self._tokens = {}
+
+    # ---------- tokens ----------
+    def _normalize(self, token):
+        """SentiText's punctuation strip: "great!!" → "great", "(great)" stays."""
+        rest = token.lstrip(string.punctuation)
+        if len(rest) < len(token) and token[:len(token) - len(rest)] in self._punc_list and self._bare(rest):
+            return rest
+        rest = token.rstrip(string.punctuation)
+        if len(rest) < len(token) and token[len(rest):] in self._punc_list and self._bare(rest):
+            return rest
+        return token
+
+    @staticmethod
+    def _bare(word):
+        # SentiText only strips down to a word of its punctuation-free text
+        return len(word) > 1 and _PUNCTUATION.isdisjoint(word)
+
+    def _token(self, raw):
+        info = self._tokens.get(raw)
+        if info is None:
+            if len(self._tokens) >= MAX_CACHED_TOKENS:
+                self._tokens.clear()
+            word = self._normalize(raw)
+            lower = word.lower()
+            info = self._tokens[raw] = (
+                word,
+                lower,
+                self.lexicon.get(lower),
+                word.isupper(),
+                lower in self._rule_words or "n't" in lower,
+            )
+        return info
+
+    # ---------- scoring ----------
+    def compound(self, text: str) -> float:
+        tokens = [self._token(raw) for raw in text.split() if len(raw) > 1]
+        if not tokens:
+            return 0.0
+        n = len(tokens)
+        caps = sum(1 for t in tokens if t[3])
+        is_cap_diff = 0 < n - caps < n
+
+        lowers = {t[1] for t in tokens}
+        if any(t[4] for t in tokens) or any(phrase <= lowers for phrase in self._phrases):
+            sentiments = self._rule_sentiments(tokens, is_cap_diff)
+        else:
+            c_incr = self.constants.C_INCR
+            sentiments = []
+            for _, _, valence, upper, _ in tokens:
+                if valence is None:
+                    sentiments.append(0)
+                    continue
+                if upper and is_cap_diff:
+                    valence = valence + c_incr if valence > 0 else valence - c_incr
+                sentiments.append(valence)
+        return self._score(sentiments, text)
+
+    def compounds(self, texts):
+        return [self.compound(text) for text in texts]
+
+    def _rule_sentiments(self, tokens, is_cap_diff):
+        """polarity_scores' word loop on pre-normalized tokens."""
+        words = [t[0] for t in tokens]
+        senti_text = _SentiText(words, is_cap_diff)
+        first_index = {}
+        for idx, word in enumerate(words):
+            first_index.setdefault(word, idx)
+        last = len(words) - 1
+        sentiments = []
+        for word, lower, valence, _, _ in tokens:
+            i = first_index[word]
+            if valence is None or lower in self._boosters or (
+                i < last and lower == "kind" and tokens[i + 1][1] == "of"
+            ):
+                sentiments.append(0)
+                continue
+            sentiments = self.sia.sentiment_valence(0, senti_text, word, i, sentiments)
+        return self.sia._but_check(words, sentiments)
+
+    def _score(self, sentiments, text):
+        """score_valence(), compound part only."""
+        sum_s = float(sum(sentiments))
+        amplifier = self.sia._punctuation_emphasis(sum_s, text)
+        if sum_s > 0:
+            sum_s += amplifier
+        elif sum_s < 0:
+            sum_s -= amplifier
+        return round(self.constants.normalize(sum_s), 4)
+
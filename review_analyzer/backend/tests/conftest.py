@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import the app's packages the way app.py does (services.*)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,70 @@
+"""Mongo pipelines vs the Python fallback, on a real mongod.
+
+mongomock has no $topN / $trim, so only a real server exercises the
+top_reviews and aspect_examples pipelines. Uses MONGO_TEST_URI (default
+mongodb://localhost:27017) and a throwaway database; skipped when no
+server answers.
+
+    MONGO_TEST_URI=mongodb://localhost:27017 python -m pytest tests
+"""
+import os
+import uuid
+
+import pytest
+from pymongo import MongoClient, errors
+
+from services import aggregations
+
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017")
+
+
+@pytest.fixture(scope="module")
+def client():
+    client = MongoClient(MONGO_TEST_URI, serverSelectionTimeoutMS=1000)
+    try:
+        info = client.server_info()
+    except errors.PyMongoError as e:
+        pytest.skip(f"no mongod at {MONGO_TEST_URI}: {e}")
+    if tuple(info["versionArray"][:2]) < (5, 2):
+        pytest.skip(f"$topN needs MongoDB 5.2+, server is {info['version']}")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def collection(client):
+    name = f"test_aggregations_{uuid.uuid4().hex[:8]}"
+    yield client[name]["reviews_processed"]
+    client.drop_database(name)
+
+
+def test_backends_agree_on_edge_cases(collection):
+    collection.insert_many(aggregations._edge_case_docs("edge"))
+    # Another product's docs must not leak into the results
+    collection.insert_many(aggregations._edge_case_docs("other")[:3])
+
+    assert aggregations.compare_backends(collection, "edge") == {
+        "sentiment_counts": "same",
+        "aspect_counts": "same",
+        "top_reviews": "same",
+        "aspect_examples": "same",
+    }
+
+
+def test_tie_break_cuts_inside_a_tie(collection):
+    collection.insert_many(aggregations._edge_case_docs("edge"))
+    tied = [d["_id"] for d in collection.find({"product_id": "edge", "text": {"$regex": "^Tied"}}).sort("_id", 1)]
+
+    top = aggregations._top_reviews_mongo(collection, "edge", aggregations.TOP_K)["Negative"]
+    assert [r["_id"] for r in top] == tied[:aggregations.TOP_K]
+    examples = aggregations._aspect_examples_mongo(collection, "edge", aggregations.ASPECT_EXAMPLES_K)
+    assert [r["_id"] for r in examples["Shipping"]["Negative"]] == tied[:aggregations.ASPECT_EXAMPLES_K]
+
+
+def test_empty_product(collection):
+    assert aggregations.compare_backends(collection, "missing") == {
+        "sentiment_counts": "same",
+        "aspect_counts": "same",
+        "top_reviews": "same",
+        "aspect_examples": "same",
+    }